@@ -0,0 +1,230 @@
+"""
+Benchmarks for parsing, traffic matrix construction, export and graph
+conversion.
+
+Every benchmark runs on the bundled DeutscheTelekom instance and on synthetic
+instances with the given numbers of demands. Results are printed and can be
+stored as JSON and compared against the JSON of an earlier run:
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --baseline results.json
+
+The exit code is 1 if any benchmark got slower than the baseline by more than
+`--threshold`.
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from repetita_parser import demands, generator, topology
+from repetita_parser.instance import _build_tm
+
+try:
+    import networkx as nx  # noqa: F401
+
+    _has_networkx = True
+except ImportError:
+    _has_networkx = False
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data" / "shared"
+BUNDLED_TOPOLOGY = DATA_DIR / "DeutscheTelekom.graph"
+BUNDLED_DEMANDS = DATA_DIR / "DeutscheTelekom.0000.demands"
+
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class Result:
+    name: str
+    size: str
+    seconds: float
+    peak_mib: Optional[float] = None
+    lines_per_s: Optional[float] = None
+    mb_per_s: Optional[float] = None
+
+
+@dataclass
+class InstanceFiles:
+    size: str
+    topology_file: Path
+    demands_file: Path
+
+
+def write_synthetic(directory: Path, num_demands: int, seed: int = 0) -> InstanceFiles:
+    """Write a random instance with `num_demands` demands and about `sqrt(num_demands)` nodes"""
+    num_nodes = max(2, int(np.sqrt(num_demands)))
+    files = InstanceFiles(str(num_demands), directory / f"{num_demands}.graph", directory / f"{num_demands}.demands")
+
+    topo = generator.generate_topology(num_nodes, degree=8, seed=seed)
+    topo.export(files.topology_file)
+    generator.write_demands(files.demands_file, topo, num_demands, seed=seed)
+    return files
+
+
+def _count_lines(file_path: Path) -> int:
+    with open(file_path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def measure(
+    name: str,
+    size: str,
+    func: Callable[[], object],
+    repeat: int,
+    num_lines: Optional[int] = None,
+    num_bytes: Optional[int] = None,
+) -> Result:
+    """
+    Time `func` (best of `repeat` runs) and measure its peak memory in a
+    separate run, since tracing allocations slows it down.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    seconds = min(times)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Result(
+        name,
+        size,
+        seconds,
+        peak / 2**20,
+        num_lines / seconds if num_lines is not None else None,
+        num_bytes / 2**20 / seconds if num_bytes is not None else None,
+    )
+
+
+def bench_instance(files: InstanceFiles, repeat: int) -> List[Result]:
+    topo_lines = _count_lines(files.topology_file)
+    topo_bytes = files.topology_file.stat().st_size
+    dems_lines = _count_lines(files.demands_file)
+    dems_bytes = files.demands_file.stat().st_size
+
+    topo = topology.parse(files.topology_file)
+    dems = demands.parse(files.demands_file)
+
+    results = [
+        measure(
+            "topology.parse",
+            files.size,
+            lambda: topology.parse(files.topology_file),
+            repeat,
+            topo_lines,
+            topo_bytes,
+        ),
+        measure(
+            "demands.parse",
+            files.size,
+            lambda: demands.parse(files.demands_file),
+            repeat,
+            dems_lines,
+            dems_bytes,
+        ),
+        measure("_build_tm", files.size, lambda: _build_tm(topo, dems), repeat, len(dems)),
+        measure("Topology.export", files.size, lambda: topo.export(io.StringIO()), repeat, topo_lines, topo_bytes),
+        measure("Demands.export", files.size, lambda: dems.export(io.StringIO()), repeat, dems_lines, dems_bytes),
+    ]
+    if _has_networkx:
+        results.append(measure("as_nx_graph", files.size, topo.as_nx_graph, repeat, topo.num_edges))
+    return results
+
+
+def import_time(repeat: int) -> Result:
+    """Best wall time of importing the package in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import repetita_parser.instance; print(time.perf_counter() - t)"
+    times = [float(subprocess.check_output([sys.executable, "-c", code], text=True)) for _ in range(repeat)]
+    return Result("import", "-", min(times))
+
+
+def compare(results: List[Result], baseline: Dict, threshold: float) -> bool:
+    """Print the speed relative to `baseline` and return whether no benchmark regressed"""
+    baseline_seconds = {(r["name"], r["size"]): r["seconds"] for r in baseline["results"]}
+    ok = True
+    print(f"\n{'benchmark':<20} {'size':>10} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for result in results:
+        before = baseline_seconds.get((result.name, result.size))
+        if before is None:
+            continue
+        ratio = result.seconds / before
+        regressed = ratio > threshold
+        ok &= not regressed
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{result.name:<20} {result.size:>10} {before:>12.6f} {result.seconds:>12.6f} {ratio:>8.2f}{marker}")
+    return ok
+
+
+def _format(value: Optional[float], fmt: str) -> str:
+    return "-" if value is None else format(value, fmt)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=[10_000, 100_000, 1_000_000],
+        help="numbers of demands of the synthetic instances",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the fastest one counts")
+    parser.add_argument("--output", type=Path, help="write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against the JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.1, help="slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    results = [import_time(args.repeat)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        instances = [InstanceFiles("bundled", BUNDLED_TOPOLOGY, BUNDLED_DEMANDS)]
+        instances += [write_synthetic(Path(tmp_dir), size) for size in args.sizes]
+        for files in instances:
+            results += bench_instance(files, args.repeat)
+
+    print(f"{'benchmark':<20} {'size':>10} {'seconds':>12} {'peak MiB':>10} {'lines/s':>14} {'MB/s':>10}")
+    for r in results:
+        print(
+            f"{r.name:<20} {r.size:>10} {r.seconds:>12.6f} {_format(r.peak_mib, '10.2f'):>10} "
+            f"{_format(r.lines_per_s, '14,.0f'):>14} {_format(r.mb_per_s, '10.1f'):>10}"
+        )
+
+    if args.output is not None:
+        report = {
+            "version": RESULTS_FORMAT_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "results": [asdict(r) for r in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if not compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
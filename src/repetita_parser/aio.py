@@ -0,0 +1,74 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Optional
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from repetita_parser import demands, topology
+from repetita_parser.cache import ParseCache
+from repetita_parser.instance import Instance
+from repetita_parser.types import PathLike
+
+
+async def parse_topology(
+    file_path: PathLike,
+    strict: bool = True,
+    executor: Optional[Executor] = None,
+    cache: Optional[ParseCache] = None,
+) -> topology.Topology:
+    """
+    Asynchronous variant of `topology.parse()`. The file is read and parsed
+    on `executor`, or on the event loop's default executor if it is `None`.
+    Cancellation stops waiting for the result right away, but a parse that
+    has already started in the executor runs to completion in the background.
+    """
+    parse = cache.parse_topology if cache is not None else topology.parse
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(parse, file_path, strict=strict))
+
+
+async def parse_demands(
+    file_path: PathLike,
+    strict: bool = True,
+    executor: Optional[Executor] = None,
+    cache: Optional[ParseCache] = None,
+) -> demands.Demands:
+    """Asynchronous variant of `demands.parse()`, see `parse_topology()`"""
+    parse = cache.parse_demands if cache is not None else demands.parse
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(parse, file_path, strict=strict))
+
+
+async def load_instance(
+    topology_file: PathLike,
+    demands_file: PathLike,
+    strict: bool = True,
+    executor: Optional[Executor] = None,
+    cache: Optional[ParseCache] = None,
+    sparse_tm: bool = False,
+    tm_dtype: DTypeLike = np.float64,
+    validate: bool = True,
+) -> Instance:
+    """
+    Asynchronous variant of `Instance()`. The topology and demands files are
+    parsed concurrently. If either of them fails to parse, the other parse is
+    cancelled and the error is raised.
+    """
+    topo_task = asyncio.ensure_future(parse_topology(topology_file, strict, executor, cache))
+    dems_task = asyncio.ensure_future(parse_demands(demands_file, strict, executor, cache))
+    try:
+        await asyncio.gather(topo_task, dems_task)
+    except BaseException:
+        topo_task.cancel()
+        dems_task.cancel()
+        raise
+
+    topo, dems = topo_task.result(), dems_task.result()
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        partial(Instance.from_parsed, topo, dems, sparse_tm=sparse_tm, tm_dtype=tm_dtype, validate=validate),
+    )
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Dict, Optional, Protocol, Type, TypeVar
+
+import numpy as np
+
+from repetita_parser import demands, topology
+from repetita_parser.types import PathLike
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR_NAME = "__repetita_cache__"
+
+_META_FILE = "meta.json"
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class _DataclassColumns(Protocol):
+    __dataclass_fields__: ClassVar[Dict[str, Any]]
+
+
+_Columns = TypeVar("_Columns", bound=_DataclassColumns)
+
+
+def _file_digest(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_columns(entry_dir: Path, prefix: str, columns: Any) -> None:
+    for f in fields(columns):
+        np.save(entry_dir / f"{prefix}.{f.name}.npy", getattr(columns, f.name))
+
+
+def _load_columns(entry_dir: Path, prefix: str, cls: Type[_Columns]) -> _Columns:
+    arrays = {f.name: np.load(entry_dir / f"{prefix}.{f.name}.npy", mmap_mode="r") for f in fields(cls)}
+    return cls(**arrays)
+
+
+def _save_topology(entry_dir: Path, topo: topology.Topology) -> None:
+    _save_columns(entry_dir, "node", topo.node_columns)
+    _save_columns(entry_dir, "edge", topo.edge_columns)
+
+
+def _load_topology(entry_dir: Path, file_path: PathLike) -> topology.Topology:
+    return topology.Topology.from_columns(
+        _load_columns(entry_dir, "node", topology.NodeColumns),
+        _load_columns(entry_dir, "edge", topology.EdgeColumns),
+        file_path,
+    )
+
+
+def _save_demands(entry_dir: Path, dems: demands.Demands) -> None:
+    _save_columns(entry_dir, "demand", dems.columns)
+
+
+def _load_demands(entry_dir: Path, file_path: PathLike) -> demands.Demands:
+    return demands.Demands.from_columns(_load_columns(entry_dir, "demand", demands.DemandColumns), file_path)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.iterdir() if p.is_file())
+
+
+def _remove_entry(root: Path, entry_dir: Path) -> None:
+    # Move the entry aside first so that it disappears atomically for
+    # concurrent readers, which then see a cache miss instead of a partially
+    # deleted entry
+    aside = root / f".old-{uuid.uuid4().hex}"
+    try:
+        os.rename(entry_dir, aside)
+    except OSError:
+        return
+    shutil.rmtree(aside, ignore_errors=True)
+
+
+class ParseCache:
+    """
+    Persistent cache for parsed topology and demand files. Parsed data is
+    stored as one `.npy` file per column and memory-mapped on load, so repeated
+    loads of the same file skip tokenization entirely.
+
+    Entries are stored in `cache_dir` or, if it is not given, in a
+    `__repetita_cache__` directory next to each source file. An entry is
+    identified by the absolute path of its source file and the parsing mode; it
+    is only used while the size, modification time and SHA-256 hash of the
+    source file match the recorded values. If only the modification time
+    changed, the hash is recomputed to decide whether the entry is still valid.
+
+    If `max_size` (in bytes) is given, the least recently used entries of a
+    cache directory are evicted whenever a new entry pushes the directory above
+    that size.
+    """
+
+    def __init__(self, cache_dir: Optional[PathLike] = None, max_size: Optional[int] = None) -> None:
+        self.cache_dir = Path(os.fsdecode(cache_dir)).expanduser() if cache_dir is not None else None
+        self.max_size = max_size
+
+    def parse_topology(self, file_path: PathLike, strict: bool = True) -> topology.Topology:
+        """Cached equivalent of `topology.parse()`"""
+        return self._cached(
+            "topology",
+            file_path,
+            strict,
+            parse=lambda: topology.parse(file_path, strict=strict),
+            save=_save_topology,
+            load=lambda entry_dir: _load_topology(entry_dir, file_path),
+        )
+
+    def parse_demands(self, file_path: PathLike, strict: bool = True) -> demands.Demands:
+        """Cached equivalent of `demands.parse()`"""
+        return self._cached(
+            "demands",
+            file_path,
+            strict,
+            parse=lambda: demands.parse(file_path, strict=strict),
+            save=_save_demands,
+            load=lambda entry_dir: _load_demands(entry_dir, file_path),
+        )
+
+    def clear(self) -> None:
+        """Remove all entries from `cache_dir`"""
+        if self.cache_dir is not None and self.cache_dir.is_dir():
+            shutil.rmtree(self.cache_dir)
+
+    def _root_for(self, source: Path) -> Path:
+        if self.cache_dir is not None:
+            return self.cache_dir
+        return source.parent / DEFAULT_CACHE_DIR_NAME
+
+    def _cached(
+        self,
+        kind: str,
+        file_path: PathLike,
+        strict: bool,
+        parse: Callable[[], Any],
+        save: Callable[[Path, Any], Any],
+        load: Callable[[Path], Any],
+    ) -> Any:
+        source = Path(os.fsdecode(file_path)).resolve()
+        root = self._root_for(source)
+
+        key = f"{CACHE_FORMAT_VERSION}:{kind}:{int(strict)}:{source}"
+        entry_dir = root / hashlib.sha256(key.encode()).hexdigest()
+
+        stat = source.stat()
+        meta = self._read_meta(entry_dir)
+        if meta is not None:
+            # Other processes sharing the cache may replace or evict the entry
+            # at any time, in which case it is treated as a miss
+            try:
+                if self._is_valid(meta, source, stat, entry_dir):
+                    # Record the access for LRU eviction
+                    os.utime(entry_dir / _META_FILE)
+                    return load(entry_dir)
+            except (OSError, ValueError):
+                pass
+
+        # Hash before parsing and only store the entry if the file was not
+        # modified in the meantime, so that the hash matches the parsed data
+        digest = _file_digest(source)
+        parsed = parse()
+        new_stat = source.stat()
+        if (new_stat.st_size, new_stat.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return parsed
+
+        meta = {
+            "key": key,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+        }
+        self._store(root, entry_dir, meta, lambda d: save(d, parsed))
+
+        return parsed
+
+    @staticmethod
+    def _read_meta(entry_dir: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry_dir / _META_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _is_valid(meta: Dict[str, Any], source: Path, stat: os.stat_result, entry_dir: Path) -> bool:
+        if meta.get("size") != stat.st_size:
+            return False
+
+        if meta.get("mtime_ns") != stat.st_mtime_ns:
+            # Contents may be unchanged (e.g., after `touch`), so fall back to
+            # comparing hashes before discarding the entry
+            if meta.get("sha256") != _file_digest(source):
+                return False
+
+            meta["mtime_ns"] = stat.st_mtime_ns
+            with open(entry_dir / _META_FILE, "w") as f:
+                json.dump(meta, f)
+
+        return True
+
+    def _store(self, root: Path, entry_dir: Path, meta: Dict[str, Any], save: Callable[[Path], Any]) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+
+        # Write into a temporary directory first so that concurrent readers
+        # never observe a partially written entry
+        tmp_dir = Path(tempfile.mkdtemp(dir=root, prefix=".tmp-"))
+        aside = root / f".old-{uuid.uuid4().hex}"
+        try:
+            save(tmp_dir)
+            with open(tmp_dir / _META_FILE, "w") as f:
+                json.dump(meta, f)
+
+            # A non-empty directory cannot be replaced, so move an existing
+            # entry aside. If another process stores the same entry in the
+            # meantime, `os.replace()` fails and its entry is kept.
+            try:
+                os.rename(entry_dir, aside)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        finally:
+            shutil.rmtree(aside, ignore_errors=True)
+
+        if self.max_size is not None:
+            self._evict(root, keep=entry_dir)
+
+    def _evict(self, root: Path, keep: Path) -> None:
+        assert self.max_size is not None
+
+        entries = []
+        for entry_dir in root.iterdir():
+            # Skip temporary directories of entries being stored or removed
+            if entry_dir.name.startswith("."):
+                continue
+            try:
+                entries.append(((entry_dir / _META_FILE).stat().st_mtime, entry_dir, _dir_size(entry_dir)))
+            except OSError:
+                # Not an entry, or removed concurrently
+                continue
+
+        total_size = sum(size for _, _, size in entries)
+        for _, entry_dir, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if entry_dir == keep:
+                continue
+            _remove_entry(root, entry_dir)
+            total_size -= size
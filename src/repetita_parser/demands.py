@@ -1,15 +1,40 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from io import TextIOBase
-from typing import List
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union, overload
+
+import numpy as np
 
 from repetita_parser.errors import ParseError
-from repetita_parser.types import PathLike
-from repetita_parser.utils import has_inline_comment, is_comment_line
+from repetita_parser.stats import ParseStats, phase
+from repetita_parser.types import ExportTarget, ParseSource, PathLike
+from repetita_parser.utils import (
+    column_chunks,
+    columns_equal,
+    detect_compression,
+    format_rows,
+    group_indices,
+    has_inline_comment,
+    is_comment_line,
+    is_path,
+    list_chunks,
+    open_export_target,
+    open_source,
+    read_source,
+    resolve_source_name,
+)
 
 DEMANDS_ID = "DEMANDS"
 DEMANDS_MEMO_LINE = "label src dest bw\n"
 
+# Lookup table for bytes that `str.split()` treats as whitespace within the
+# ASCII range
+_IS_ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+_IS_ASCII_WHITESPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+_NEWLINE = ord("\n")
 
+_NO_INDICES = np.zeros(0, dtype=np.int64)
+_NO_INDICES.flags.writeable = False
 
 
 @dataclass
@@ -20,26 +45,129 @@ class Demand:
     bandwidth: float
 
 
+@dataclass
+class DemandColumns:
+    """
+    Column-wise representation of a list of demands. Entry `i` of each array
+    belongs to the `i`-th demand.
+    """
+
+    label: np.ndarray
+    src: np.ndarray
+    dest: np.ndarray
+    bandwidth: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @classmethod
+    def from_list(cls, demands: List[Demand]) -> "DemandColumns":
+        return cls(
+            np.array([d.label for d in demands], dtype=str),
+            np.fromiter((d.src for d in demands), dtype=np.int64, count=len(demands)),
+            np.fromiter((d.dest for d in demands), dtype=np.int64, count=len(demands)),
+            np.fromiter((d.bandwidth for d in demands), dtype=np.float64, count=len(demands)),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: List["DemandColumns"]) -> "DemandColumns":
+        return cls(
+            np.concatenate([p.label for p in parts]),
+            np.concatenate([p.src for p in parts]),
+            np.concatenate([p.dest for p in parts]),
+            np.concatenate([p.bandwidth for p in parts]),
+        )
+
+    def to_list(self) -> List[Demand]:
+        return [
+            Demand(label, src, dest, bw)
+            for label, src, dest, bw in zip(
+                self.label.tolist(), self.src.tolist(), self.dest.tolist(), self.bandwidth.tolist()
+            )
+        ]
+
+
 class Demands:
     """
     Wrapper object for demands. Use `Demands.list` to get access to the
-    actual `Demand` objects.
+    actual `Demand` objects or `Demands.columns` for a column-wise view backed
+    by NumPy arrays. Whichever representation is missing is built on first
+    access; modifying `Demands.list` afterwards is not reflected in
+    `Demands.columns` or in any of the lookup structures derived from it.
     """
 
     def __init__(self, demands: List[Demand], source_file: PathLike) -> None:
-        self.list = demands
+        self._list: Optional[List[Demand]] = demands
+        self._columns: Optional[DemandColumns] = None
+        self._derived: Dict[str, Any] = {}
 
         self.source_file = source_file
 
-    def export(self, target: TextIOBase) -> None:
-        target.writelines(
-            [
-                f"{DEMANDS_ID} {len(self.list)}\n",
-                DEMANDS_MEMO_LINE,
-            ]
-        )
+    @classmethod
+    def from_columns(cls, columns: DemandColumns, source_file: PathLike) -> "Demands":
+        retval = cls.__new__(cls)
+        retval._list = None
+        retval._columns = columns
+        retval._derived = {}
+        retval.source_file = source_file
+        return retval
+
+    @property
+    def list(self) -> List[Demand]:
+        if self._list is None:
+            assert self._columns is not None
+            self._list = self._columns.to_list()
+        return self._list
+
+    @list.setter  # noqa: A003
+    def list(self, demands: List[Demand]) -> None:
+        self._list = demands
+        self._columns = None
+        self._derived.clear()
+
+    @property
+    def columns(self) -> DemandColumns:
+        if self._columns is None:
+            assert self._list is not None
+            self._columns = DemandColumns.from_list(self._list)
+        return self._columns
+
+    def indices_from(self, src: int) -> np.ndarray:
+        """Indices into `self.list` of all demands originating at node `src`"""
+        if "by_src" not in self._derived:
+            self._derived["by_src"] = group_indices(self.columns.src)
+        return self._derived["by_src"].get(src, _NO_INDICES)
+
+    def indices_to(self, dest: int) -> np.ndarray:
+        """Indices into `self.list` of all demands destined to node `dest`"""
+        if "by_dest" not in self._derived:
+            self._derived["by_dest"] = group_indices(self.columns.dest)
+        return self._derived["by_dest"].get(dest, _NO_INDICES)
 
-        target.writelines([f"{d.label} {d.src} {d.dest} {d.bandwidth}\n" for d in self.list])
+    def __len__(self) -> int:
+        if self._list is not None:
+            return len(self._list)
+        assert self._columns is not None
+        return len(self._columns)
+
+    def export(self, target: ExportTarget) -> None:
+        """
+        Write the demands in REPETITA format to a text stream, a binary stream
+        or a file path. Paths ending in `.gz`, `.xz` or `.zst` are compressed
+        with gzip, xz or zstd, respectively; zstd requires the `zstandard`
+        package. Demands are formatted and written in chunks.
+        """
+        with open_export_target(target) as write:
+            write(f"{DEMANDS_ID} {len(self)}\n")
+            write(DEMANDS_MEMO_LINE)
+
+            if self._list is not None:
+                for chunk in list_chunks(self._list):
+                    write("".join([f"{d.label} {d.src} {d.dest} {d.bandwidth}\n" for d in chunk]))
+            else:
+                assert self._columns is not None
+                for column_chunk in column_chunks(self._columns):
+                    write(format_rows(column_chunk))
 
     def __eq__(self, other) -> bool:
         """
@@ -47,7 +175,10 @@ class Demands:
         themselves , i.e., two instances can be equal although their source
         files differ.
         """
-        return self.list == other.list
+        if self._list is not None and other._list is not None:
+            return self._list == other._list
+
+        return columns_equal(self.columns, other.columns)
 
     def __ne__(self, other) -> bool:
         """
@@ -55,62 +186,349 @@ class Demands:
         themselves , i.e., two instances can be equal although their source
         files differ.
         """
-        return not (self.list == other.list)
+        return not (self == other)
 
 
-def parse(file_path: PathLike, strict: bool = True) -> Demands:
+def _parse_bulk(text: str) -> Optional[DemandColumns]:
+    """
+    Fast path for well-formed demand files: convert the whole data section
+    into typed columns at once. Returns `None` whenever the input is not
+    obviously valid (comments, non-ASCII content, malformed lines, ...) so the
+    caller can fall back to `_parse_lines()` which reports the exact error.
+    """
+    if "#" in text or not text.isascii():
+        return None
+
+    parts = text.split("\n", 2)
+    num_leading_lines = 2
+    if len(parts) <= num_leading_lines:
+        return None
+    header, memo, body = parts
+
+    header_fields = header.split()
+    num_header_fields = 2
+    if len(header_fields) != num_header_fields or header_fields[0] != DEMANDS_ID:
+        return None
+    if memo + "\n" != DEMANDS_MEMO_LINE:
+        return None
+
+    return _parse_bulk_body(body)
+
+
+def _parse_bulk_body(body: str) -> Optional[DemandColumns]:
+    """Data section part of `_parse_bulk()`"""
+    if "#" in body or not body.isascii():
+        return None
+
+    # Every line of the data section has to consist of exactly four fields.
+    # Count the tokens starting on each line to verify this without splitting
+    # the body line by line.
+    num_demand_fields = 4
+    raw = np.frombuffer(body.encode("ascii"), dtype=np.uint8)
+    line_ends = np.flatnonzero(raw == _NEWLINE)
+    if raw.size > 0 and raw[-1] != _NEWLINE:
+        line_ends = np.append(line_ends, raw.size)
+    num_lines = len(line_ends)
+
+    is_space = _IS_ASCII_WHITESPACE[raw]
+    is_token_start = ~is_space
+    is_token_start[1:] &= is_space[:-1]
+    token_starts = np.flatnonzero(is_token_start)
+    tokens_before_line_end = np.searchsorted(token_starts, line_ends)
+    tokens_per_line = np.diff(tokens_before_line_end, prepend=0)
+    if np.any(tokens_per_line != num_demand_fields):
+        return None
+
+    tokens = body.split()
+    try:
+        src = np.fromiter(map(int, tokens[1::4]), dtype=np.int64, count=num_lines)
+        dest = np.fromiter(map(int, tokens[2::4]), dtype=np.int64, count=num_lines)
+        bw = np.fromiter(map(float, tokens[3::4]), dtype=np.float64, count=num_lines)
+    except (ValueError, OverflowError):
+        return None
+
+    return DemandColumns(np.array(tokens[0::4], dtype=str), src, dest, bw)
+
+
+def _iter_fields(
+    lines: Iterable[str], file_path: PathLike, strict: bool, body_only: bool = False
+) -> Iterator[List[str]]:
+    """
+    Validate header, memo line and comments and yield the fields of every
+    demand line. If `body_only` is set, `lines` are expected to be a part of
+    the data section, i.e., no header and memo line are expected.
+    """
     num_demand_fields = 4
     # If this changes, we have to touch the impl
     assert num_demand_fields == len(DEMANDS_MEMO_LINE.strip().split(" "))
 
-    demands: List[Demand] = []
+    line_idx = 0
+    header_processed = body_only
+    memo_processed = body_only
+
+    for line in lines:
+        line_idx += 1
 
-    with open(file_path) as f:
-        line_idx = 0
-        header_processed = False
-        memo_processed = False
+        # Skip comments in non-strict mode
+        if is_comment_line(line):
+            if strict:
+                msg = "unexpected comment line in strict mode"
+                raise ParseError(msg, file_path, line_idx)
+            continue
 
-        for line in f:
-            line_idx += 1
+        # Check for inline comments (should fail in both modes)
+        if has_inline_comment(line):
+            msg = "inline comments not allowed in data lines"
+            raise ParseError(msg, file_path, line_idx)
 
-            # Skip comments in non-strict mode
-            if is_comment_line(line):
-                if strict:
-                    msg = "unexpected comment line in strict mode"
-                    raise ParseError(msg, file_path, line_idx)
-                continue
+        fields = line.strip("\n").split()
 
-            # Check for inline comments (should fail in both modes)
-            if has_inline_comment(line):
-                msg = "inline comments not allowed in data lines"
+        if not header_processed:
+            # First non-comment line should be DEMANDS header
+            num_header_fields = 2
+            if len(fields) != num_header_fields or fields[0] != DEMANDS_ID:
+                msg = "expected demands header line"
+                raise ParseError(msg, file_path, line_idx)
+            header_processed = True
+        elif not memo_processed:
+            # Second non-comment line should be memo line
+            if line != DEMANDS_MEMO_LINE:
+                msg = "expected demands memo line"
+                raise ParseError(msg, file_path, line_idx)
+            memo_processed = True
+        else:
+            # Subsequent non-comment lines should be demand data
+            if len(fields) != num_demand_fields:
+                msg = "not all demand fields present"
                 raise ParseError(msg, file_path, line_idx)
 
-            fields = line.strip("\n").split()
-
-            if not header_processed:
-                # First non-comment line should be DEMANDS header
-                num_header_fields = 2
-                if len(fields) != num_header_fields or fields[0] != DEMANDS_ID:
-                    msg = "expected demands header line"
-                    raise ParseError(msg, file_path, line_idx)
-                header_processed = True
-            elif not memo_processed:
-                # Second non-comment line should be memo line
-                if line != DEMANDS_MEMO_LINE:
-                    msg = "expected demands memo line"
-                    raise ParseError(msg, file_path, line_idx)
-                memo_processed = True
-            else:
-                # Subsequent non-comment lines should be demand data
-                if len(fields) != num_demand_fields:
-                    msg = "not all demand fields present"
-                    raise ParseError(msg, file_path, line_idx)
+            yield fields
+
+
+def _parse_lines(lines: Iterable[str], file_path: PathLike, strict: bool, body_only: bool = False) -> List[Demand]:
+    return [
+        Demand(fields[0], int(fields[1]), int(fields[2]), float(fields[3]))
+        for fields in _iter_fields(lines, file_path, strict, body_only)
+    ]
+
+
+def _columns_from_fields(batch: List[List[str]]) -> DemandColumns:
+    return DemandColumns(
+        np.array([fields[0] for fields in batch], dtype=str),
+        np.fromiter((int(fields[1]) for fields in batch), dtype=np.int64, count=len(batch)),
+        np.fromiter((int(fields[2]) for fields in batch), dtype=np.int64, count=len(batch)),
+        np.fromiter((float(fields[3]) for fields in batch), dtype=np.float64, count=len(batch)),
+    )
+
+
+@overload
+def iter_parse(
+    file_path: ParseSource, strict: bool = ..., batch_size: None = ..., source_name: Optional[str] = ...
+) -> Iterator[Demand]: ...
+
+
+@overload
+def iter_parse(
+    file_path: ParseSource, strict: bool = ..., *, batch_size: int, source_name: Optional[str] = ...
+) -> Iterator[DemandColumns]: ...
+
+
+def iter_parse(
+    file_path: ParseSource, strict: bool = True, batch_size: Optional[int] = None, source_name: Optional[str] = None
+) -> Union[Iterator[Demand], Iterator[DemandColumns]]:
+    """
+    Lazily parse a demands file, performing the same validation as `parse()`.
+    Only the current line (or batch) is held in memory, so this is suitable
+    for single passes over files that do not fit into memory.
+
+    Without a `batch_size`, one `Demand` is yielded per line. Otherwise,
+    `DemandColumns` with up to `batch_size` demands each are yielded.
+
+    `file_path` and `source_name` are handled as in `parse()`.
+    """
+    if batch_size is None:
+        return _iter_demands(file_path, strict, source_name)
+
+    if batch_size < 1:
+        msg = "batch_size must be positive"
+        raise ValueError(msg)
+    return _iter_batches(file_path, strict, batch_size, source_name)
+
+
+def _iter_demands(file_path: ParseSource, strict: bool, source_name: Optional[str]) -> Iterator[Demand]:
+    name = resolve_source_name(file_path, source_name)
+    with open_source(file_path) as f:
+        for fields in _iter_fields(f, name, strict):
+            yield Demand(fields[0], int(fields[1]), int(fields[2]), float(fields[3]))
+
+
+def _iter_batches(
+    file_path: ParseSource, strict: bool, batch_size: int, source_name: Optional[str]
+) -> Iterator[DemandColumns]:
+    name = resolve_source_name(file_path, source_name)
+    with open_source(file_path) as f:
+        batch: List[List[str]] = []
+        for fields in _iter_fields(f, name, strict):
+            batch.append(fields)
+            if len(batch) == batch_size:
+                yield _columns_from_fields(batch)
+                batch = []
+
+        if batch:
+            yield _columns_from_fields(batch)
+
+
+def _count_lines(text: str) -> int:
+    num_lines = text.count("\n")
+    if text and not text.endswith("\n"):
+        num_lines += 1
+    return num_lines
+
+
+def _decode(data: bytes) -> str:
+    # Decode the same way `open()` in text mode would
+    return io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+def _parse_range(file_path: PathLike, start: int, end: int, strict: bool) -> Tuple[DemandColumns, int]:
+    """
+    Parse the demand lines in bytes `[start, end)` of a file. Line numbers of
+    raised `ParseError`s are relative to `start`. Returns the parsed demands
+    and the number of lines in the range.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = _decode(f.read(end - start))
+
+    columns = _parse_bulk_body(text)
+    if columns is None:
+        demands = _parse_lines(io.StringIO(text), file_path, strict, body_only=True)
+        columns = DemandColumns.from_list(demands)
+
+    return columns, _count_lines(text)
+
+
+def _read_prologue(f: BinaryIO, file_path: PathLike, strict: bool) -> Optional[int]:
+    """
+    Read and validate everything up to and including the memo line. Returns
+    the number of lines read, or `None` if the file ends before the data
+    section. `f` is positioned at the start of the data section afterwards.
+    """
+    prologue = b""
+    num_leading_lines = 2
+    num_non_comment_lines = 0
+    while num_non_comment_lines < num_leading_lines:
+        line = f.readline()
+        if not line:  # EOF
+            break
+        prologue += line
+        if not is_comment_line(line.decode(errors="replace")):
+            num_non_comment_lines += 1
+
+    text = _decode(prologue)
+    _parse_lines(io.StringIO(text), file_path, strict)
+    if num_non_comment_lines < num_leading_lines:
+        return None
+
+    return _count_lines(text)
+
+
+def _parse_parallel(file_path: PathLike, strict: bool, max_workers: int, source_name: PathLike) -> Demands:
+    with open(file_path, "rb") as f:
+        num_prologue_lines = _read_prologue(f, source_name, strict)
+        if num_prologue_lines is None:
+            return Demands([], source_name)
+
+        # Split the data section into ranges that end right after a newline.
+        # Using a few more ranges than workers evens out their run times.
+        data_start = f.tell()
+        data_end = f.seek(0, io.SEEK_END)
+        num_ranges = 4 * max_workers
+        boundaries = [data_start]
+        for i in range(1, num_ranges):
+            f.seek(max(data_start + (data_end - data_start) * i // num_ranges, boundaries[-1]))
+            f.readline()
+            if f.tell() > boundaries[-1]:
+                boundaries.append(f.tell())
+        if boundaries[-1] < data_end:
+            boundaries.append(data_end)
+
+    ranges = list(zip(boundaries[:-1], boundaries[1:]))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_parse_range, file_path, start, end, strict) for start, end in ranges]
+
+        # Collect results in file order so that the first error in the file
+        # is the one that is reported
+        results: List[DemandColumns] = []
+        line_offset = num_prologue_lines
+        for future in futures:
+            try:
+                columns, num_lines = future.result()
+            except ParseError as e:
+                for pending in futures:
+                    pending.cancel()
+                assert e.line_num is not None
+                raise ParseError(e.message, source_name, line_offset + e.line_num) from None
+            results.append(columns)
+            line_offset += num_lines
+
+    if not results:
+        return Demands([], source_name)
+
+    return Demands.from_columns(DemandColumns.concatenate(results), source_name)
+
+
+def parse(
+    file_path: ParseSource,
+    strict: bool = True,
+    max_workers: int = 1,
+    source_name: Optional[str] = None,
+    stats: Optional[ParseStats] = None,
+) -> Demands:
+    """
+    Parse a demands file. Well-formed files are converted into NumPy columns in
+    bulk; if that fails, the file is parsed line by line so that errors point
+    to the offending line.
+
+    With `max_workers > 1`, the data section is split into byte ranges that are
+    parsed on a process pool with up to `max_workers` processes. This only pays
+    off for very large files. Compressed files (see `utils.open_input()`) are
+    always parsed in the current process since they cannot be split.
+
+    Instead of a path, an open text or binary stream or a `bytes`-like buffer
+    can be passed; buffers are decoded without copying them first. Errors and
+    the resulting `Demands` refer to the source by `source_name` if given, or
+    else by its path.
+
+    If `stats` are passed, reading the file and converting it are recorded as
+    the `"demands.read"` and `"demands.convert"` phases. The parallel parser
+    records a single `"demands.parse"` phase instead.
+    """
+    name = resolve_source_name(file_path, source_name)
+    if max_workers > 1 and is_path(file_path) and detect_compression(file_path) is None:  # type: ignore[arg-type]
+        with phase(stats, "demands.parse") as parse_stats:
+            dems = _parse_parallel(file_path, strict, max_workers, name)  # type: ignore[arg-type]
+            if parse_stats is not None:
+                parse_stats.lines = len(dems)
+        return dems
+
+    with phase(stats, "demands.read") as read_stats:
+        text = read_source(file_path)
+        if read_stats is not None:
+            read_stats.bytes_read = len(text)
 
-                label = fields[0]
-                src = int(fields[1])
-                dest = int(fields[2])
-                bw = float(fields[3])
+    with phase(stats, "demands.convert") as convert_stats:
+        columns = _parse_bulk(text)
+        if columns is not None:
+            dems = Demands.from_columns(columns, name)
+        else:
+            dems = Demands(_parse_lines(io.StringIO(text), name, strict), name)
 
-                demands.append(Demand(label, src, dest, bw))
+        if convert_stats is not None:
+            # Apart from comments, there are only the header, memo and demand lines
+            num_leading_lines = 2
+            convert_stats.lines = _count_lines(text)
+            convert_stats.comment_lines = max(convert_stats.lines - len(dems) - num_leading_lines, 0)
 
-    return Demands(demands, file_path)
+    return dems
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from repetita_parser.types import PathLike
 
@@ -9,6 +9,10 @@ class ParseError(Exception):
         self.file_path = file_path
         self.line_num = line_num
 
+    def __reduce__(self):
+        # Keep the error picklable, e.g., for passing it between processes
+        return (type(self), (self.message, self.file_path, self.line_num))
+
     def __str__(self):
         retval = ""
 
@@ -30,8 +34,20 @@ class ParseError(Exception):
 
 
 class ValidationError(Exception):
-    def __init__(self, message: str, topo_path: PathLike, demands_path: PathLike):
+    def __init__(
+        self,
+        message: str,
+        topo_path: PathLike,
+        demands_path: PathLike,
+        demand_labels: Optional[List[str]] = None,
+    ):
         super().__init__(message)
 
         self.topo_path = topo_path
         self.demands_path = demands_path
+        # Labels of all offending demands
+        self.demand_labels = demand_labels if demand_labels is not None else []
+
+    def __reduce__(self):
+        # Keep the error picklable, e.g., for passing it between processes
+        return (type(self), (*self.args, self.topo_path, self.demands_path, self.demand_labels))
@@ -0,0 +1,137 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from repetita_parser.instance import Instance
+from repetita_parser.routing import LinkLoads, _link_loads, compute_shortest_paths, route
+from repetita_parser.utils import chunked, map_unordered
+
+Scenario = Tuple[int, ...]
+
+
+@dataclass
+class FailureResult:
+    """
+    Routing outcome with the edges in `failed_edges` removed. Failed edges
+    carry no load. `unrouted` is the total traffic between node pairs that
+    are disconnected by the failure.
+    """
+
+    failed_edges: Scenario
+    link_loads: LinkLoads
+    unrouted: float
+
+    @property
+    def max_utilization(self) -> float:
+        return self.link_loads.max_utilization
+
+
+@dataclass
+class _Network:
+    num_nodes: int
+    src: np.ndarray
+    dest: np.ndarray
+    weights: np.ndarray
+    bandwidth: np.ndarray
+    traffic_matrix: np.ndarray
+
+
+# Network shared by all scenarios evaluated in a worker process. It is sent
+# once per worker instead of once per task.
+_worker_network: Optional[_Network] = None
+
+
+def _init_worker(network: _Network) -> None:
+    global _worker_network  # noqa: PLW0603
+    _worker_network = network
+
+
+def _evaluate(network: _Network, failed_edges: Scenario) -> FailureResult:
+    alive = np.ones(len(network.src), dtype=bool)
+    alive[list(failed_edges)] = False
+
+    sp = compute_shortest_paths(network.num_nodes, network.src[alive], network.dest[alive], network.weights[alive])
+
+    loads = np.zeros(len(network.src))
+    loads[alive] = route(sp, network.traffic_matrix)
+
+    disconnected = np.isinf(sp.distances)
+    unrouted = float(network.traffic_matrix[disconnected].sum())
+
+    return FailureResult(failed_edges, _link_loads(loads, network.bandwidth), unrouted)
+
+
+def _evaluate_chunk(scenarios: List[Scenario]) -> List[FailureResult]:
+    assert _worker_network is not None
+    return [_evaluate(_worker_network, scenario) for scenario in scenarios]
+
+
+def single_edge_failures(num_edges: int) -> Iterator[Scenario]:
+    """One scenario per edge, in which only that edge fails"""
+    return ((edge,) for edge in range(num_edges))
+
+
+def group_failures(groups: Iterable[Sequence[int]]) -> Iterator[Scenario]:
+    """
+    One scenario per group of edges that fail together, e.g., shared risk
+    link groups (SRLGs)
+    """
+    return (tuple(group) for group in groups)
+
+
+def analyze(
+    instance: Instance,
+    scenarios: Optional[Iterable[Scenario]] = None,
+    weights: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[FailureResult]:
+    """
+    Evaluate the routing of `instance` under each failure scenario, i.e.,
+    tuple of failed edge ids, and yield a `FailureResult` per scenario as soon
+    as it is available (not necessarily in input order). By default, every
+    single-edge failure is evaluated.
+
+    Scenarios are evaluated on a process pool in chunks of `chunksize`, with
+    at most `max_in_flight` chunks (by default, twice the number of workers)
+    pending at a time. The topology and traffic matrix are transferred to
+    each worker only once. With `max_workers=1`, scenarios are evaluated
+    sequentially in the current process.
+    """
+    if chunksize < 1:
+        msg = "chunksize must be positive"
+        raise ValueError(msg)
+
+    topology = instance.topology
+    traffic_matrix = instance.traffic_matrix
+    if hasattr(traffic_matrix, "toarray"):
+        traffic_matrix = traffic_matrix.toarray()
+
+    columns = topology.edge_columns
+    network = _Network(
+        topology.num_nodes,
+        np.asarray(columns.src),
+        np.asarray(columns.dest),
+        np.asarray(columns.weight if weights is None else weights, dtype=np.float64),
+        np.asarray(columns.bandwidth),
+        np.asarray(traffic_matrix, dtype=np.float64),
+    )
+
+    if scenarios is None:
+        scenarios = single_edge_failures(topology.num_edges)
+
+    if max_workers == 1:
+        for scenario in scenarios:
+            yield _evaluate(network, tuple(scenario))
+        return
+
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+
+    chunks = chunked((tuple(scenario) for scenario in scenarios), chunksize)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(network,)) as executor:
+        yield from map_unordered(executor, _evaluate_chunk, chunks, max_in_flight)
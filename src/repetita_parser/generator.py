@@ -0,0 +1,185 @@
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from repetita_parser.demands import DEMANDS_ID, DEMANDS_MEMO_LINE, DemandColumns, Demands
+from repetita_parser.topology import EdgeColumns, NodeColumns, Topology
+from repetita_parser.types import ExportTarget
+from repetita_parser.utils import format_rows, open_export_target
+
+GRAPH_MODELS = ("random", "geometric")
+TRAFFIC_MODELS = ("uniform", "gravity")
+
+# Demands are generated in chunks of this size, each from its own random
+# stream. It is fixed so that results only depend on the seed.
+_CHUNK_SIZE = 1 << 20
+# Maximum number of node pairs whose distances are computed at once
+_MAX_DISTANCE_BLOCK = 1 << 22
+
+_BANDWIDTHS = np.array([1e6, 2.5e6, 1e7])
+_MAX_DEMAND_BANDWIDTH = 100000
+_SOURCE_LABEL = "<generated>"
+_MIN_NODES = 2
+
+
+def _check_model(model: str, models: Tuple[str, ...]) -> None:
+    if model not in models:
+        msg = f"unknown model {model!r}, expected one of {', '.join(models)}"
+        raise ValueError(msg)
+
+
+def _labels(prefix: str, start: int, stop: int) -> np.ndarray:
+    return np.array([prefix + str(i) for i in range(start, stop)])
+
+
+def _random_links(rng: np.random.Generator, num_nodes: int, num_links: int) -> Tuple[np.ndarray, np.ndarray]:
+    # A ring keeps the graph connected; the remaining links are uniformly random
+    ring_src = np.arange(num_nodes)
+    ring_dest = (ring_src + 1) % num_nodes
+
+    num_random = max(num_links - len(ring_src), 0)
+    src = rng.integers(0, num_nodes, num_random)
+    dest = (src + rng.integers(1, num_nodes, num_random)) % num_nodes
+    return np.concatenate([ring_src, src]), np.concatenate([ring_dest, dest])
+
+
+def _nearest_links(x: np.ndarray, y: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Link every node to its `k` nearest neighbors, computing distances in
+    # blocks of rows to bound memory
+    num_nodes = len(x)
+    k = min(k, num_nodes - 1)
+    block = max(1, _MAX_DISTANCE_BLOCK // num_nodes)
+
+    neighbors = np.empty((num_nodes, k), dtype=np.int64)
+    for start in range(0, num_nodes, block):
+        stop = min(start + block, num_nodes)
+        dist = (x[start:stop, np.newaxis] - x) ** 2 + (y[start:stop, np.newaxis] - y) ** 2
+        dist[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        neighbors[start:stop] = np.argpartition(dist, k - 1, axis=1)[:, :k]
+
+    # Links are undirected, so drop pairs found from both ends
+    src = np.repeat(np.arange(num_nodes), k)
+    dest = neighbors.ravel()
+    pair_ids = np.unique(np.minimum(src, dest) * num_nodes + np.maximum(src, dest))
+    return pair_ids // num_nodes, pair_ids % num_nodes
+
+
+def generate_topology(num_nodes: int, degree: int = 4, model: str = "random", seed: Optional[int] = None) -> Topology:
+    """
+    Generate a topology with `num_nodes` nodes at random coordinates. Like in
+    the REPETITA datasets, nodes are connected by links that consist of one
+    edge in each direction.
+
+    - `"random"`: A ring through all nodes plus uniformly random links, for
+      an average out-degree of about `degree`. The graph is strongly
+      connected, but may contain parallel edges.
+    - `"geometric"`: Every node is linked to its `degree // 2` nearest
+      neighbors (at least one), so the graph may be disconnected.
+
+    Edges have weight 1, one of a few bandwidths, and a delay that is random
+    (`"random"`) or proportional to the link length (`"geometric"`). The
+    same `seed` yields the same topology.
+    """
+    _check_model(model, GRAPH_MODELS)
+    if num_nodes < _MIN_NODES:
+        msg = "at least two nodes are required"
+        raise ValueError(msg)
+
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-180, 180, num_nodes)
+    y = rng.uniform(-90, 90, num_nodes)
+
+    if model == "random":
+        src, dest = _random_links(rng, num_nodes, num_nodes * degree // 2)
+        delay = rng.integers(1, 1000, len(src)).astype(np.float64)
+    else:
+        src, dest = _nearest_links(x, y, max(1, degree // 2))
+        delay = np.ceil(np.hypot(x[src] - x[dest], y[src] - y[dest]) * 100)
+
+    bandwidth = rng.choice(_BANDWIDTHS, len(src))
+
+    # Interleave both directions of each link
+    num_edges = 2 * len(src)
+    edge_src = np.empty(num_edges, dtype=np.int64)
+    edge_src[0::2], edge_src[1::2] = src, dest
+    edge_dest = np.empty(num_edges, dtype=np.int64)
+    edge_dest[0::2], edge_dest[1::2] = dest, src
+
+    nodes = NodeColumns(_labels("node_", 0, num_nodes), x, y)
+    edges = EdgeColumns(
+        _labels("edge_", 0, num_edges),
+        edge_src,
+        edge_dest,
+        np.ones(num_edges),
+        np.repeat(bandwidth, 2),
+        np.repeat(delay, 2),
+    )
+    return Topology.from_columns(nodes, edges, _SOURCE_LABEL)
+
+
+def _demand_chunks(topology: Topology, num_demands: int, model: str, seed: Optional[int]) -> Iterator[DemandColumns]:
+    num_nodes = topology.num_nodes
+    num_chunks = -(-num_demands // _CHUNK_SIZE)
+    mass_seed, *chunk_seeds = np.random.SeedSequence(seed).spawn(num_chunks + 1)
+
+    probabilities = None
+    if model == "gravity":
+        # Node masses are their outgoing bandwidth, randomly scaled
+        edges = topology.edge_columns
+        out_bandwidth = np.bincount(edges.src, weights=edges.bandwidth, minlength=num_nodes)
+        mass = out_bandwidth * np.random.default_rng(mass_seed).exponential(size=num_nodes)
+        if mass.sum() > 0:
+            probabilities = mass / mass.sum()
+
+    for chunk, chunk_seed in enumerate(chunk_seeds):
+        rng = np.random.default_rng(chunk_seed)
+        start = chunk * _CHUNK_SIZE
+        size = min(_CHUNK_SIZE, num_demands - start)
+
+        src = rng.choice(num_nodes, size, p=probabilities)
+        dest = rng.choice(num_nodes, size, p=probabilities)
+        # Redirect self-demands to a uniformly random other node
+        is_self = src == dest
+        dest[is_self] = (src[is_self] + rng.integers(1, num_nodes, is_self.sum())) % num_nodes
+
+        bandwidth = rng.integers(1, _MAX_DEMAND_BANDWIDTH, size).astype(np.float64)
+        yield DemandColumns(_labels("demand_", start, start + size), src, dest, bandwidth)
+
+
+def generate_demands(
+    topology: Topology, num_demands: int, model: str = "uniform", seed: Optional[int] = None
+) -> Demands:
+    """
+    Generate `num_demands` demands between distinct nodes of `topology`.
+
+    - `"uniform"`: Sources and destinations are uniformly random.
+    - `"gravity"`: Sources and destinations are drawn with probability
+      proportional to a node mass, i.e., the traffic between two nodes is
+      proportional to the product of their masses in expectation. The mass of
+      a node is its outgoing bandwidth, scaled by a random factor.
+
+    Bandwidths are uniformly random integers. The same `seed` yields the same
+    demands as `write_demands()`.
+    """
+    _check_model(model, TRAFFIC_MODELS)
+    chunks = list(_demand_chunks(topology, num_demands, model, seed))
+    if not chunks:
+        return Demands([], _SOURCE_LABEL)
+    return Demands.from_columns(DemandColumns.concatenate(chunks), _SOURCE_LABEL)
+
+
+def write_demands(
+    target: ExportTarget, topology: Topology, num_demands: int, model: str = "uniform", seed: Optional[int] = None
+) -> None:
+    """
+    Generate demands as in `generate_demands()` and write them to `target`
+    (see `Demands.export()`) chunk by chunk, so that memory use does not grow
+    with `num_demands`.
+    """
+    _check_model(model, TRAFFIC_MODELS)
+    chunks = _demand_chunks(topology, num_demands, model, seed)
+    with open_export_target(target) as write:
+        write(f"{DEMANDS_ID} {num_demands}\n")
+        write(DEMANDS_MEMO_LINE)
+        for chunk in chunks:
+            write(format_rows(chunk))
@@ -1,56 +1,221 @@
-from io import TextIOBase
-from os import PathLike
-from string import Template
+import importlib.util
+from typing import Optional, Tuple
 
 import numpy as np
+from numpy.typing import DTypeLike
 
 from repetita_parser import demands, errors, topology
+from repetita_parser.cache import ParseCache
+from repetita_parser.stats import ParseStats, phase
+from repetita_parser.types import ExportTarget, ParseSource
+from repetita_parser.utils import is_path
 
+# SciPy is slow to import, so it is only imported once a sparse traffic matrix
+# is built
+_has_scipy = importlib.util.find_spec("scipy") is not None
 
-def _build_tm(topology: topology.Topology, demands: demands.Demands) -> np.ndarray:
+
+def _aggregate_demands(num_nodes: int, demands: demands.Demands) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum the bandwidth of all demands between the same node pair. Returns
+    source indices, destination indices and summed bandwidths, ordered by
+    source and then destination.
+
+    Raises an `IndexError` if a node index is out of range, since it would
+    otherwise be attributed to a different node pair.
+    """
+    columns = demands.columns
+    if len(columns) > 0:
+        low = min(columns.src.min(), columns.dest.min())
+        high = max(columns.src.max(), columns.dest.max())
+        if low < 0 or high >= num_nodes:
+            index = low if low < 0 else high
+            msg = f"node index {index} is out of bounds for a topology with {num_nodes} nodes"
+            raise IndexError(msg)
+
+    pair_ids = columns.src * num_nodes + columns.dest
+    unique_ids, inverse = np.unique(pair_ids, return_inverse=True)
+    bandwidths = np.bincount(inverse.ravel(), weights=columns.bandwidth, minlength=len(unique_ids))
+
+    return unique_ids // num_nodes, unique_ids % num_nodes, bandwidths
+
+
+def _build_tm(
+    topology: topology.Topology,
+    demands: demands.Demands,
+    sparse: bool = False,
+    dtype: DTypeLike = np.float64,
+    stats: Optional[ParseStats] = None,
+):
     """
     Per the format specification, demands between the same node pair can occur
     multiple times. This function collapses the list of demands into a
     two-dimensional traffic matrix that sums all demands between any given pair
     into a single value.
+
+    If `sparse` is set, a `scipy.sparse.csr_matrix` is returned instead of a
+    dense `np.ndarray`. This requires SciPy to be installed.
+
+    If `stats` are passed, the construction is recorded as the
+    `"instance.traffic_matrix"` phase.
     """
-    num_nodes = len(topology.nodes)
-    tm = np.zeros(shape=(num_nodes, num_nodes))
+    if sparse and not _has_scipy:
+        msg = "SciPy is required to build a sparse traffic matrix"
+        raise ImportError(msg)
 
-    for d in demands.list:
-        tm[d.src, d.dest] += d.bandwidth
+    with phase(stats, "instance.traffic_matrix") as tm_stats:
+        if tm_stats is not None:
+            tm_stats.lines = len(demands)
 
-    return tm
+        num_nodes = topology.num_nodes
+        src, dest, bandwidths = _aggregate_demands(num_nodes, demands)
 
+        if sparse:
+            import scipy.sparse  # noqa: PLC0415
 
-class Instance:
-    def __init__(self, topology_file: PathLike, demands_file: PathLike, strict: bool = True) -> None:
-        self.topology: topology.Topology = topology.parse(topology_file, strict=strict)
-        self.demands: demands.Demands = demands.parse(demands_file, strict=strict)
+            return scipy.sparse.csr_matrix(
+                (bandwidths.astype(dtype, copy=False), (src, dest)),
+                shape=(num_nodes, num_nodes),
+            )
+
+        tm = np.zeros(shape=(num_nodes, num_nodes), dtype=dtype)
+        tm[src, dest] = bandwidths
+
+        return tm
 
-        # Check if all indices in parsed demands are valid for parsed topology
-        min_node_idx, max_node_idx = 0, len(self.topology.nodes) - 1
-        for d in self.demands.list:
-            src_ok = min_node_idx <= d.src <= max_node_idx
-            dest_ok = min_node_idx <= d.dest <= max_node_idx
 
-            if not (src_ok and dest_ok):
-                msg_template = Template(f"demand {d.label}: node index $index does not exist in topology")
+# Maximum number of offending demands spelled out in a validation error message
+_MAX_REPORTED_DEMANDS = 10
 
-                if not src_ok:
-                    msg = msg_template.substitute(index=d.src)
-                else:
-                    msg = msg_template.substitute(index=d.dest)
 
-                # XXX: In theory, both indices could be invalid. In that case,
-                #      we only report the invalid source index.
+def _validate(topology: topology.Topology, demands: demands.Demands) -> None:
+    """
+    Check if all node indices in the demands are valid for the topology. All
+    offending demands are collected into a single `ValidationError`.
+    """
+    num_nodes = topology.num_nodes
+    columns = demands.columns
+    src_bad = (columns.src < 0) | (columns.src >= num_nodes)
+    dest_bad = (columns.dest < 0) | (columns.dest >= num_nodes)
+    bad = np.flatnonzero(src_bad | dest_bad)
+    if len(bad) == 0:
+        return
+
+    labels = columns.label[bad].tolist()
+    details = []
+    for i, label in zip(bad[:_MAX_REPORTED_DEMANDS].tolist(), labels):
+        indices = [str(columns.src[i])] if src_bad[i] else []
+        if dest_bad[i]:
+            indices.append(str(columns.dest[i]))
 
-                raise errors.ValidationError(msg, topology_file, demands_file)
+        if len(indices) == 1:
+            details.append(f"demand {label}: node index {indices[0]} does not exist in topology")
+        else:
+            details.append(f"demand {label}: node indices {', '.join(indices)} do not exist in topology")
+
+    if len(bad) > _MAX_REPORTED_DEMANDS:
+        details.append(f"and {len(bad) - _MAX_REPORTED_DEMANDS} more invalid demands")
+
+    raise errors.ValidationError("; ".join(details), topology.source_file, demands.source_file, labels)
+
+
+class Instance:
+    def __init__(
+        self,
+        topology_file: ParseSource,
+        demands_file: ParseSource,
+        strict: bool = True,
+        cache: Optional[ParseCache] = None,
+        sparse_tm: bool = False,
+        tm_dtype: DTypeLike = np.float64,
+        validate: bool = True,
+        topology_name: Optional[str] = None,
+        demands_name: Optional[str] = None,
+        stats: Optional[ParseStats] = None,
+    ) -> None:
+        """
+        Parse and validate a problem instance. Both sources can be paths, open
+        streams or `bytes`-like buffers; `topology_name` and `demands_name`
+        replace their paths in errors (see `topology.parse()`). If a
+        `ParseCache` is passed, sources given as paths without a name are
+        loaded through it.
+
+        `sparse_tm` and `tm_dtype` control the representation of
+        `traffic_matrix`, see `_build_tm()`.
+
+        With `validate=False`, the demands are not checked against the
+        topology, e.g., for trusted inputs. Validation can then be run later
+        with `validate()`.
+
+        If `stats` are passed, the phases of parsing (except for cached
+        files), validation and traffic matrix construction are recorded in
+        them.
+        """
+        self.topology: topology.Topology
+        self.demands: demands.Demands
+        if cache is not None and topology_name is None and is_path(topology_file):
+            self.topology = cache.parse_topology(topology_file, strict=strict)  # type: ignore[arg-type]
+        else:
+            self.topology = topology.parse(topology_file, strict=strict, source_name=topology_name, stats=stats)
+
+        if cache is not None and demands_name is None and is_path(demands_file):
+            self.demands = cache.parse_demands(demands_file, strict=strict)  # type: ignore[arg-type]
+        else:
+            self.demands = demands.parse(demands_file, strict=strict, source_name=demands_name, stats=stats)
+
+        self._setup(sparse_tm, tm_dtype, validate, stats)
+
+    @classmethod
+    def from_parsed(
+        cls,
+        topology: topology.Topology,
+        demands: demands.Demands,
+        sparse_tm: bool = False,
+        tm_dtype: DTypeLike = np.float64,
+        validate: bool = True,
+        stats: Optional[ParseStats] = None,
+    ) -> "Instance":
+        """
+        Create an instance from an already parsed topology and demands. The
+        demands are validated against the topology as in `__init__()`.
+        """
+        retval = cls.__new__(cls)
+        retval.topology = topology
+        retval.demands = demands
+        retval._setup(sparse_tm, tm_dtype, validate, stats)
+        return retval
+
+    def _setup(self, sparse_tm: bool, tm_dtype: DTypeLike, validate: bool, stats: Optional[ParseStats]) -> None:
+        self.stats = stats
+        if validate:
+            self.validate()
+
+        self.sparse_tm = sparse_tm
+        self.tm_dtype = tm_dtype
+        self._traffic_matrix = None
+
+    def validate(self) -> None:
+        """
+        Check that all demands refer to nodes of the topology. Raises a
+        `ValidationError` listing every offending demand. This is recorded as
+        the `"instance.validate"` phase if the instance has `stats`.
+        """
+        with phase(self.stats, "instance.validate") as validate_stats:
+            if validate_stats is not None:
+                validate_stats.lines = len(self.demands)
+            _validate(self.topology, self.demands)
 
-        self.traffic_matrix = _build_tm(self.topology, self.demands)
+    @property
+    def traffic_matrix(self):
         """
-        Total traffic demand from node `i` to node `j` at `traffic_matrix[i, j]`
+        Total traffic demand from node `i` to node `j` at `traffic_matrix[i, j]`.
+        The matrix is built on first access.
         """
+        if self._traffic_matrix is None:
+            self._traffic_matrix = _build_tm(
+                self.topology, self.demands, sparse=self.sparse_tm, dtype=self.tm_dtype, stats=self.stats
+            )
+        return self._traffic_matrix
 
     def __eq__(self, other) -> bool:
         return all(
@@ -63,6 +228,6 @@ class Instance:
     def __ne__(self, other) -> bool:
         return not (self == other)
 
-    def export(self, topology_target: TextIOBase, demands_target: TextIOBase) -> None:
+    def export(self, topology_target: ExportTarget, demands_target: ExportTarget) -> None:
         self.topology.export(topology_target)
         self.demands.export(demands_target)
@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from repetita_parser.cache import ParseCache
+from repetita_parser.errors import ParseError, ValidationError
+from repetita_parser.instance import Instance
+from repetita_parser.types import PathLike
+from repetita_parser.utils import chunked, map_unordered, snapshot_files
+
+InstanceFiles = Tuple[Path, Path]
+
+
+@dataclass
+class LoadResult:
+    """
+    Outcome of loading a single instance. Exactly one of `instance` and
+    `error` is set.
+    """
+
+    topology_file: Path
+    demands_file: Path
+    instance: Optional[Instance] = None
+    error: Optional[Union[ParseError, ValidationError]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def discover(root: PathLike) -> List[InstanceFiles]:
+    """
+    Find all instances below `root`. Every `<name>.graph` file is paired with
+    the `<name>.demands` and `<name>.<index>.demands` files in the same
+    directory (see `utils.snapshot_files()`). Pairs are ordered by path.
+    """
+    pairs: List[InstanceFiles] = []
+    for topology_file in sorted(Path(os.fsdecode(root)).rglob("*.graph")):
+        name = topology_file.name[: -len(".graph")]
+        candidates = [topology_file.with_name(f"{name}.demands"), *snapshot_files(topology_file.parent, name)]
+        pairs.extend((topology_file, demands_file) for demands_file in sorted(candidates) if demands_file.is_file())
+
+    return pairs
+
+
+def _load_chunk(chunk: List[InstanceFiles], strict: bool, cache: Optional[ParseCache]) -> List[LoadResult]:
+    results = []
+    for topology_file, demands_file in chunk:
+        try:
+            instance = Instance(topology_file, demands_file, strict=strict, cache=cache)
+        except (ParseError, ValidationError) as e:
+            results.append(LoadResult(topology_file, demands_file, error=e))
+        else:
+            results.append(LoadResult(topology_file, demands_file, instance=instance))
+
+    return results
+
+
+def load(
+    source: Union[PathLike, Iterable[InstanceFiles]],
+    strict: bool = True,
+    cache: Optional[ParseCache] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[LoadResult]:
+    """
+    Load many instances on a process pool and yield a `LoadResult` for each of
+    them as soon as it is available, i.e., not necessarily in input order.
+
+    `source` is either a directory that is searched with `discover()` or an
+    iterable of `(topology_file, demands_file)` pairs. Pairs are sent to the
+    workers in chunks of `chunksize`. At most `max_in_flight` chunks (by
+    default, twice the number of workers) are pending at any time, which
+    bounds the number of parsed instances held in memory. With
+    `max_workers=1`, instances are loaded sequentially in the current process.
+
+    Parse and validation errors are reported through `LoadResult.error`; any
+    other exception is raised.
+    """
+    if chunksize < 1:
+        msg = "chunksize must be positive"
+        raise ValueError(msg)
+
+    if isinstance(source, (str, bytes, os.PathLike)):
+        pairs: Iterable[InstanceFiles] = discover(source)
+    else:
+        pairs = ((Path(os.fsdecode(t)), Path(os.fsdecode(d))) for t, d in source)
+
+    chunks = chunked(pairs, chunksize)
+
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from _load_chunk(chunk, strict, cache)
+        return
+
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from map_unordered(executor, partial(_load_chunk, strict=strict, cache=cache), chunks, max_in_flight)
@@ -0,0 +1,576 @@
+import importlib.util
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from repetita_parser.instance import Instance
+    from repetita_parser.topology import Topology
+    from repetita_parser.types import PathLike
+
+# SciPy is slow to import and this module is imported with the topology, so
+# SciPy is only imported by the functions that use it
+_has_scipy = importlib.util.find_spec("scipy") is not None
+
+# Relative tolerance when checking whether an edge lies on a shortest path.
+# Distances are sums of floating point weights which may be associated
+# differently along different paths.
+_RTOL = 1e-9
+
+
+@dataclass
+class ShortestPaths:
+    """
+    Result of an all-pairs shortest path computation under IGP weights with
+    equal-cost multi-path (ECMP) routing.
+
+    - `distances[i, j]` is the length of a shortest path from node `i` to node
+      `j` (`np.inf` if there is none).
+    - `on_path[e, t]` indicates whether edge `e` lies on a shortest path from
+      its source towards destination `t`.
+    - `splits[e, t]` is the fraction of the traffic towards `t` at the source
+      of edge `e` that is forwarded over `e`. Traffic is split evenly among
+      all outgoing edges on shortest paths, so parallel edges each get their
+      own share.
+    """
+
+    edge_src: np.ndarray
+    edge_dest: np.ndarray
+    weights: np.ndarray
+    distances: np.ndarray
+    on_path: np.ndarray
+    splits: np.ndarray
+
+    @property
+    def num_nodes(self) -> int:
+        return self.distances.shape[0]
+
+    def next_hops(self, src: int, dest: int) -> np.ndarray:
+        """Ids of the edges over which `src` forwards traffic towards `dest`"""
+        return np.flatnonzero(self.on_path[:, dest] & (self.edge_src == src))
+
+
+def _lightest_graph(num_nodes: int, src: np.ndarray, dest: np.ndarray, weights: np.ndarray):
+    # A sparse matrix would sum the weights of parallel edges, so only keep the
+    # lightest edge between every node pair
+    pair_ids = src * num_nodes + dest
+    order = np.lexsort((weights, pair_ids))
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = pair_ids[order][1:] != pair_ids[order][:-1]
+    lightest = order[is_first]
+
+    import scipy.sparse  # noqa: PLC0415
+
+    return scipy.sparse.csr_matrix((weights[lightest], (src[lightest], dest[lightest])), shape=(num_nodes, num_nodes))
+
+
+def _distances_scipy(num_nodes: int, src: np.ndarray, dest: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    import scipy.sparse.csgraph  # noqa: PLC0415
+
+    return scipy.sparse.csgraph.dijkstra(_lightest_graph(num_nodes, src, dest, weights), directed=True)
+
+
+def _distances_numpy(num_nodes: int, src: np.ndarray, dest: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    distances = np.full((num_nodes, num_nodes), np.inf)
+    np.minimum.at(distances, (src, dest), weights)
+    np.fill_diagonal(distances, 0.0)
+
+    # Floyd-Warshall, vectorized over all node pairs per intermediate node
+    for k in range(num_nodes):
+        np.minimum(distances, distances[:, k, np.newaxis] + distances[np.newaxis, k, :], out=distances)
+
+    return distances
+
+
+def _distances_to(
+    num_nodes: int, src: np.ndarray, dest: np.ndarray, weights: np.ndarray, dests: np.ndarray, use_scipy: bool
+) -> np.ndarray:
+    """Distances from all nodes to the nodes in `dests`, one column per node"""
+    if use_scipy:
+        import scipy.sparse.csgraph  # noqa: PLC0415
+
+        graph = _lightest_graph(num_nodes, src, dest, weights)
+        # Distances from `t` in the reversed graph are distances towards `t`
+        return scipy.sparse.csgraph.dijkstra(graph.T, directed=True, indices=dests).T
+
+    # Bellman-Ford, vectorized over all edges and destinations
+    distances = np.full((num_nodes, len(dests)), np.inf)
+    distances[dests, np.arange(len(dests))] = 0.0
+    for _ in range(num_nodes):
+        relaxed = distances.copy()
+        np.minimum.at(relaxed, src, weights[:, np.newaxis] + distances[dest, :])
+        if np.array_equal(relaxed, distances):
+            break
+        distances = relaxed
+
+    return distances
+
+
+def _ecmp(
+    num_nodes: int,
+    src: np.ndarray,
+    dest: np.ndarray,
+    weights: np.ndarray,
+    distances_to: np.ndarray,
+    dests: np.ndarray,
+):
+    """
+    Shortest path mask and ECMP splits (one column per node in `dests`) given
+    the distances towards these nodes
+    """
+    # Edge `u -> v` is on a shortest path towards `t` iff d(u, t) = w + d(v, t)
+    via_edge = weights[:, np.newaxis] + distances_to[dest, :]
+    dist_src = distances_to[src, :]
+    on_path = np.isfinite(dist_src) & np.isclose(dist_src, via_edge, rtol=_RTOL, atol=0.0)
+    # Traffic towards `t` that has reached `t` is not forwarded any further
+    on_path[src[:, np.newaxis] == dests[np.newaxis, :]] = False
+
+    # Number of ECMP next hops per (node, destination)
+    num_next_hops = np.zeros((num_nodes, len(dests)), dtype=np.int64)
+    np.add.at(num_next_hops, src, on_path)
+    splits = np.where(on_path, 1.0 / np.maximum(num_next_hops[src, :], 1), 0.0)
+
+    return on_path, splits
+
+
+def _check_weights(weights: np.ndarray, num_edges: int) -> None:
+    if weights.shape != (num_edges,):
+        msg = "expected one weight per edge"
+        raise ValueError(msg)
+    if np.any(weights < 0) or np.any(np.isnan(weights)):
+        msg = "edge weights must be non-negative"
+        raise ValueError(msg)
+
+
+def _resolve_use_scipy(use_scipy: Optional[bool]) -> bool:
+    if use_scipy is None:
+        return _has_scipy
+    if use_scipy and not _has_scipy:
+        msg = "SciPy is required to compute shortest paths with Dijkstra's algorithm"
+        raise ImportError(msg)
+    return use_scipy
+
+
+def compute_shortest_paths(
+    num_nodes: int, src: np.ndarray, dest: np.ndarray, weights: np.ndarray, use_scipy: Optional[bool] = None
+) -> ShortestPaths:
+    """
+    Compute all-pairs shortest paths and ECMP splits for the edges
+    `src[e] -> dest[e]` with the given non-negative weights. SciPy's Dijkstra
+    implementation is used if available (or if `use_scipy` is set); otherwise,
+    a vectorized Floyd-Warshall is run with NumPy.
+    """
+    weights = np.array(weights, dtype=np.float64)
+    _check_weights(weights, len(src))
+
+    if _resolve_use_scipy(use_scipy):
+        distances = _distances_scipy(num_nodes, src, dest, weights)
+    else:
+        distances = _distances_numpy(num_nodes, src, dest, weights)
+
+    on_path, splits = _ecmp(num_nodes, src, dest, weights, distances, np.arange(num_nodes))
+
+    for array in (weights, distances, on_path, splits):
+        # Results are cached and shared
+        array.flags.writeable = False
+
+    return ShortestPaths(src, dest, weights, distances, on_path, splits)
+
+
+@dataclass
+class LinkLoads:
+    """
+    Per-edge traffic of a routed traffic matrix. `loads[e]` is the traffic on
+    edge `e` and `utilization[e]` its ratio to the edge's bandwidth.
+    """
+
+    loads: np.ndarray
+    utilization: np.ndarray
+
+    @property
+    def max_utilization(self) -> float:
+        return float(self.utilization.max()) if len(self.utilization) > 0 else 0.0
+
+
+def _segment_sum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Sum `values[offsets[i]:offsets[i + 1]]` along the first axis for all `i`"""
+    out = np.zeros((len(offsets) - 1, *values.shape[1:]), dtype=values.dtype)
+    non_empty = offsets[:-1] < offsets[1:]
+    if np.any(non_empty):
+        out[non_empty] = np.add.reduceat(values, offsets[:-1][non_empty], axis=0)
+    return out
+
+
+def _in_offsets(num_nodes: int, edge_dest: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_dest, minlength=num_nodes), out=offsets[1:])
+    return offsets
+
+
+def route(shortest_paths: ShortestPaths, traffic_matrix) -> np.ndarray:
+    """
+    Route `traffic_matrix` (dense or SciPy sparse) along the ECMP shortest
+    paths and return the load of every edge. Traffic between node pairs
+    without a path is dropped.
+
+    Traffic is propagated hop by hop for all destinations at once: in every
+    step, the traffic present at each node is split over its next hops
+    towards each destination and moved to the respective neighbors.
+    """
+    if hasattr(traffic_matrix, "toarray"):
+        traffic_matrix = traffic_matrix.toarray()
+
+    num_nodes = shortest_paths.num_nodes
+    dest_loads = _propagate(
+        shortest_paths.edge_src,
+        shortest_paths.edge_dest,
+        shortest_paths.splits,
+        np.asarray(traffic_matrix, dtype=np.float64),
+        np.arange(num_nodes),
+    )
+    return dest_loads.sum(axis=1)
+
+
+def _propagate(
+    edge_src: np.ndarray, edge_dest: np.ndarray, splits: np.ndarray, traffic: np.ndarray, dests: np.ndarray
+) -> np.ndarray:
+    """
+    Per-edge loads of the traffic towards each node in `dests`, given the
+    ECMP splits and the traffic from every node (one column per node in
+    `dests`)
+    """
+    num_nodes = traffic.shape[0]
+    in_order = np.argsort(edge_dest, kind="stable")
+    in_offsets = _in_offsets(num_nodes, edge_dest)
+    columns = np.arange(len(dests))
+
+    loads = np.zeros(splits.shape)
+    # `in_transit[u, j]` is the traffic towards `dests[j]` currently at node `u`
+    in_transit = traffic.copy()
+    in_transit[dests, columns] = 0.0
+
+    # Without zero-weight cycles, every shortest path has less than
+    # `num_nodes` hops
+    for _ in range(num_nodes):
+        if not in_transit.any():
+            break
+        flows = in_transit[edge_src, :] * splits
+        loads += flows
+        in_transit = _segment_sum(flows[in_order], in_offsets)
+        in_transit[dests, columns] = 0.0
+    else:
+        if in_transit.any():
+            msg = "traffic did not converge, the weights likely contain zero-weight cycles"
+            raise ValueError(msg)
+
+    return loads
+
+
+def _require_scipy() -> None:
+    if not _has_scipy:
+        msg = "SciPy is required to work with routing matrices"
+        raise ImportError(msg)
+
+
+# Maximum number of (source, destination) pairs whose paths are traced at
+# once when building a routing matrix
+_MAX_BLOCK_PAIRS = 1 << 20
+
+
+def _trace_block(
+    shortest_paths: ShortestPaths, dests: np.ndarray
+) -> Tuple[List[np.ndarray], List[np.ndarray], List[np.ndarray]]:
+    """
+    Edges, columns and values of the routing matrix entries of all node pairs
+    towards the nodes in `dests`
+    """
+    num_nodes = shortest_paths.num_nodes
+    num_dests = len(dests)
+    edge_dest = shortest_paths.edge_dest
+
+    # Next hops of every (node, destination) pair, i.e., the edges on shortest
+    # paths sorted by `node * num_dests + j` for destination `dests[j]`
+    hop_edges, hop_dests = np.nonzero(shortest_paths.on_path[:, dests])
+    hop_keys = shortest_paths.edge_src[hop_edges] * num_dests + hop_dests
+    order = np.argsort(hop_keys, kind="stable")
+    hop_edges = hop_edges[order]
+    hop_splits = shortest_paths.splits[hop_edges, dests[hop_dests[order]]]
+    hop_offsets = np.zeros(num_nodes * num_dests + 1, dtype=np.int64)
+    np.cumsum(np.bincount(hop_keys, minlength=num_nodes * num_dests), out=hop_offsets[1:])
+
+    # The traffic of every node pair `(s, dests[j])` is traced as a set of
+    # fractions of it at the nodes it has reached, starting with all of it
+    # at `s`
+    src, j = np.divmod(np.arange(num_nodes * num_dests), num_dests)
+    starts_away = src != dests[j]
+    src, j = src[starts_away], j[starts_away]
+    nodes = src
+    fractions: np.ndarray = np.ones(len(src))
+
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    # Without zero-weight cycles, every shortest path has less than
+    # `num_nodes` hops
+    for _ in range(num_nodes):
+        keys = nodes * num_dests + j
+        starts = hop_offsets[keys]
+        counts = hop_offsets[keys + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            return rows, cols, values
+
+        # Expand every fraction to the next hops of its node
+        entry = np.repeat(np.arange(len(keys)), counts)
+        hops = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        edges = hop_edges[hops]
+        flows = fractions[entry] * hop_splits[hops]
+        src, j = src[entry], j[entry]
+        rows.append(edges)
+        cols.append(src * num_nodes + dests[j])
+        values.append(flows)
+
+        # Traffic that reached its destination is done; fractions of the same
+        # node pair that meet at a node are merged
+        nodes = edge_dest[edges]
+        in_transit = nodes != dests[j]
+        state_keys = (src[in_transit] * num_dests + j[in_transit]) * num_nodes + nodes[in_transit]
+        state_keys, inverse = np.unique(state_keys, return_inverse=True)
+        fractions = np.bincount(inverse.ravel(), weights=flows[in_transit], minlength=len(state_keys))
+        pairs, nodes = np.divmod(state_keys, num_nodes)
+        src, j = np.divmod(pairs, num_dests)
+
+    if len(fractions) > 0:
+        msg = "traffic did not converge, the weights likely contain zero-weight cycles"
+        raise ValueError(msg)
+    return rows, cols, values
+
+
+def routing_matrix(shortest_paths: ShortestPaths):
+    """
+    Build the routing matrix of the ECMP shortest paths as a
+    `scipy.sparse.csr_matrix` of shape `(num_edges, num_nodes**2)`. Entry
+    `[e, s * num_nodes + t]` is the fraction of the traffic from `s` to `t`
+    that traverses edge `e`, so the link loads of a traffic matrix `tm` are
+    `routing_matrix @ tm.ravel()`.
+
+    The traffic of every node pair is traced along its shortest paths, so the
+    work grows with the number of non-zero entries, i.e., roughly with
+    `num_nodes**2` times the number of edges per path. For example, a
+    thousand nodes with paths of about ten edges yield about 10 million
+    entries, which take about 0.7 GB of memory while the matrix is built.
+
+    This requires SciPy to be installed.
+    """
+    _require_scipy()
+    import scipy.sparse  # noqa: PLC0415
+
+    num_nodes = shortest_paths.num_nodes
+    num_edges = len(shortest_paths.edge_src)
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+
+    block = max(1, _MAX_BLOCK_PAIRS // max(num_nodes, 1))
+    for start in range(0, num_nodes, block):
+        block_rows, block_cols, block_values = _trace_block(
+            shortest_paths, np.arange(start, min(start + block, num_nodes))
+        )
+        rows += block_rows
+        cols += block_cols
+        values += block_values
+
+    if not rows:
+        return scipy.sparse.csr_matrix((num_edges, num_nodes * num_nodes))
+
+    # Entries for the same edge and node pair (reached via paths with
+    # different hop counts) are summed up
+    return scipy.sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(num_edges, num_nodes * num_nodes),
+    )
+
+
+def route_batch(routing_matrix, traffic_matrices: np.ndarray) -> np.ndarray:
+    """
+    Link loads for a batch of traffic matrices of shape
+    `(num_matrices, num_nodes, num_nodes)`, e.g., `InstanceSeries.traffic_tensor`,
+    with a single sparse matrix product. Returns an array of shape
+    `(num_matrices, num_edges)`.
+    """
+    num_matrices = traffic_matrices.shape[0]
+    return np.asarray(routing_matrix @ traffic_matrices.reshape(num_matrices, -1).T).T
+
+
+def save_routing_matrix(file_path: "PathLike", routing_matrix) -> None:
+    """Store a routing matrix in SciPy's `.npz` format"""
+    _require_scipy()
+    import scipy.sparse  # noqa: PLC0415
+
+    scipy.sparse.save_npz(file_path, routing_matrix)
+
+
+def load_routing_matrix(file_path: "PathLike"):
+    """Load a routing matrix stored with `save_routing_matrix()`"""
+    _require_scipy()
+    import scipy.sparse  # noqa: PLC0415
+
+    return scipy.sparse.load_npz(file_path).tocsr()
+
+
+def evaluate(instance: "Instance", weights: Optional[np.ndarray] = None) -> LinkLoads:
+    """
+    Route the traffic matrix of `instance` with ECMP over shortest paths
+    under the given weights (defaulting to the IGP weights of the topology)
+    and compute the resulting link loads and utilizations.
+    """
+    topology = instance.topology
+    loads = route(topology.shortest_paths(weights), instance.traffic_matrix)
+    return _link_loads(loads, topology.edge_columns.bandwidth)
+
+
+def _link_loads(loads: np.ndarray, bandwidth: np.ndarray) -> LinkLoads:
+    utilization = np.divide(loads, bandwidth, out=np.full_like(loads, np.inf), where=bandwidth > 0)
+    utilization[(bandwidth <= 0) & (loads == 0)] = 0.0
+    return LinkLoads(loads, utilization)
+
+
+@dataclass
+class _WeightChange:
+    edge: int
+    weight: float
+    dests: np.ndarray
+    distances: np.ndarray
+    on_path: np.ndarray
+    splits: np.ndarray
+    dest_loads: np.ndarray
+    loads: np.ndarray
+
+
+class RoutingState:
+    """
+    Mutable ECMP shortest-path routing of a traffic matrix for what-if
+    analyses of weight changes, e.g., in local-search weight optimizers.
+
+    `set_weight()` changes the weight of a single edge and only recomputes the
+    shortest paths and loads towards destinations whose routing can be
+    affected by the change. Changes are recorded so that `undo()` can restore
+    the previous state without any recomputation; `commit()` discards the
+    recorded changes.
+    """
+
+    def __init__(
+        self,
+        topology: "Topology",
+        traffic_matrix,
+        weights: Optional[np.ndarray] = None,
+        use_scipy: Optional[bool] = None,
+    ) -> None:
+        if hasattr(traffic_matrix, "toarray"):
+            traffic_matrix = traffic_matrix.toarray()
+
+        self.num_nodes = topology.num_nodes
+        self.edge_src = topology.edge_columns.src
+        self.edge_dest = topology.edge_columns.dest
+        self.bandwidth = topology.edge_columns.bandwidth
+        self.traffic_matrix = np.array(traffic_matrix, dtype=np.float64)
+        self._use_scipy = _resolve_use_scipy(use_scipy)
+
+        if weights is None:
+            weights = topology.edge_columns.weight
+        sp = compute_shortest_paths(self.num_nodes, self.edge_src, self.edge_dest, weights, self._use_scipy)
+        self.weights = sp.weights.copy()
+        self.distances = sp.distances.copy()
+        self.on_path = sp.on_path.copy()
+        self.splits = sp.splits.copy()
+
+        # `dest_loads[e, t]` is the load on edge `e` caused by traffic towards `t`
+        dests = np.arange(self.num_nodes)
+        self.dest_loads = _propagate(self.edge_src, self.edge_dest, self.splits, self.traffic_matrix, dests)
+        self.loads = self.dest_loads.sum(axis=1)
+
+        self._history: List[_WeightChange] = []
+
+    @classmethod
+    def from_instance(cls, instance: "Instance", weights: Optional[np.ndarray] = None) -> "RoutingState":
+        return cls(instance.topology, instance.traffic_matrix, weights)
+
+    @property
+    def num_changes(self) -> int:
+        """Number of changes that can be undone"""
+        return len(self._history)
+
+    def link_loads(self) -> LinkLoads:
+        return _link_loads(self.loads.copy(), self.bandwidth)
+
+    def set_weight(self, edge: int, weight: float) -> np.ndarray:
+        """
+        Set the weight of `edge` and update distances, ECMP splits and loads.
+        Returns the destinations whose shortest paths were recomputed.
+        """
+        if not weight >= 0:
+            msg = "edge weights must be non-negative"
+            raise ValueError(msg)
+
+        u, v = self.edge_src[edge], self.edge_dest[edge]
+        if weight < self.weights[edge]:
+            # Only destinations for which the edge becomes (or stays) part of
+            # a shortest path are affected
+            via_edge = weight + self.distances[v, :]
+            dist_src = self.distances[u, :]
+            affected = np.isfinite(via_edge) & (
+                (via_edge < dist_src) | np.isclose(dist_src, via_edge, rtol=_RTOL, atol=0.0)
+            )
+        elif weight > self.weights[edge]:
+            # Only destinations whose shortest paths use the edge are affected
+            affected = self.on_path[edge, :].copy()
+        else:
+            affected = np.zeros(self.num_nodes, dtype=bool)
+        dests = np.flatnonzero(affected)
+
+        self._history.append(
+            _WeightChange(
+                edge,
+                float(self.weights[edge]),
+                dests,
+                self.distances[:, dests],
+                self.on_path[:, dests],
+                self.splits[:, dests],
+                self.dest_loads[:, dests],
+                self.loads.copy(),
+            )
+        )
+        self.weights[edge] = weight
+
+        if len(dests) > 0:
+            src, dest = self.edge_src, self.edge_dest
+            distances = _distances_to(self.num_nodes, src, dest, self.weights, dests, self._use_scipy)
+            on_path, splits = _ecmp(self.num_nodes, src, dest, self.weights, distances, dests)
+            dest_loads = _propagate(src, dest, splits, self.traffic_matrix[:, dests], dests)
+
+            self.loads += dest_loads.sum(axis=1) - self.dest_loads[:, dests].sum(axis=1)
+            self.distances[:, dests] = distances
+            self.on_path[:, dests] = on_path
+            self.splits[:, dests] = splits
+            self.dest_loads[:, dests] = dest_loads
+
+        return dests
+
+    def undo(self) -> None:
+        """Revert the most recent weight change"""
+        if not self._history:
+            msg = "no weight change to undo"
+            raise IndexError(msg)
+
+        change = self._history.pop()
+        self.weights[change.edge] = change.weight
+        self.distances[:, change.dests] = change.distances
+        self.on_path[:, change.dests] = change.on_path
+        self.splits[:, change.dests] = change.splits
+        self.dest_loads[:, change.dests] = change.dest_loads
+        self.loads = change.loads
+
+    def commit(self) -> None:
+        """Keep all changes made so far and release their undo information"""
+        self._history.clear()
@@ -0,0 +1,108 @@
+import mmap
+import os
+from dataclasses import dataclass
+from typing import IO, Optional, Tuple
+
+from repetita_parser.demands import DEMANDS_ID
+from repetita_parser.errors import ParseError
+from repetita_parser.topology import EDGES_ID, NODES_ID
+from repetita_parser.types import PathLike
+from repetita_parser.utils import detect_compression, open_input
+
+
+@dataclass
+class FileInfo:
+    """
+    Metadata of a REPETITA file as declared by its header lines. For a
+    topology file, `num_nodes` and `num_edges` are set; for a demands file,
+    `num_demands` is set.
+    """
+
+    file_path: PathLike
+    file_size: int
+    num_nodes: Optional[int] = None
+    num_edges: Optional[int] = None
+    num_demands: Optional[int] = None
+
+
+def _parse_header(line: bytes, expected_ids: Tuple[str, ...]) -> Optional[Tuple[str, int]]:
+    fields = line.decode().split()
+    num_header_fields = 2
+    if len(fields) != num_header_fields or fields[0] not in expected_ids or not fields[1].isdigit():
+        return None
+    return fields[0], int(fields[1])
+
+
+def _find_edges_header(f: IO[bytes], file_path: PathLike, line_num: int, compressed: bool) -> int:
+    """
+    Find the `EDGES` header after the node header, which `f` is positioned
+    behind and which is on line `line_num`. Returns the number of edges.
+    """
+    if compressed:
+        # Decompressed streams cannot be memory-mapped, so read line by line
+        for line in f:
+            line_num += 1
+            if line.startswith(f"{EDGES_ID} ".encode()):
+                break
+        else:
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path)
+
+        edges_header = _parse_header(line, (EDGES_ID,))
+        if edges_header is None:
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path, line_num)
+        return edges_header[1]
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = mm.find(f"\n{EDGES_ID} ".encode(), f.tell() - 1)
+        if start < 0:
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path)
+
+        end = mm.find(b"\n", start + 1)
+        edges_header = _parse_header(mm[start + 1 : end if end >= 0 else len(mm)], (EDGES_ID,))
+        if edges_header is None:
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path, mm[: start + 1].count(b"\n") + 1)
+        return edges_header[1]
+
+
+def scan(file_path: PathLike) -> FileInfo:
+    """
+    Read the counts declared in the headers of a topology or demands file
+    without parsing its contents. The file type is determined by its first
+    header line; leading comments are skipped. `file_size` is the size of the
+    file on disk, i.e., compressed files (see `utils.open_input()`) report
+    their compressed size.
+
+    For uncompressed topology files, the `EDGES` header is located by
+    searching the memory-mapped file for the first line starting with it, so
+    only the node section is read. The counts are taken as declared and are
+    not checked against the data lines.
+    """
+    file_size = os.path.getsize(file_path)
+    compressed = detect_compression(file_path) is not None
+
+    with open_input(file_path, binary=True) as f:
+        line_num = 0
+        while True:
+            line = f.readline()
+            line_num += 1
+            if not line:  # EOF
+                msg = "expected nodes or demands header line"
+                raise ParseError(msg, file_path, line_num)
+            if not line.lstrip().startswith(b"#"):
+                break
+
+        header = _parse_header(line, (NODES_ID, DEMANDS_ID))
+        if header is None:
+            msg = "expected nodes or demands header line"
+            raise ParseError(msg, file_path, line_num)
+
+        header_id, count = header
+        if header_id == DEMANDS_ID:
+            return FileInfo(file_path, file_size, num_demands=count)
+
+        num_edges = _find_edges_header(f, file_path, line_num, compressed)
+        return FileInfo(file_path, file_size, num_nodes=count, num_edges=num_edges)
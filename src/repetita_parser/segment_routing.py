@@ -0,0 +1,74 @@
+import numpy as np
+
+from repetita_parser.routing import ShortestPaths, routing_matrix
+
+
+class SegmentRouting:
+    """
+    Precomputed per-edge load contributions of two-segment paths for segment
+    routing traffic engineering. A two-segment path from `s` to `t` via the
+    midpoint `m` follows the ECMP shortest paths from `s` to `m` and then from
+    `m` to `t`; choosing `m = s` or `m = t` yields the plain shortest path.
+
+    The contributions are derived from the sparse routing matrix (see
+    `routing.routing_matrix()`), which is stored twice in compressed sparse
+    column format: once with the columns of each source and once with the
+    columns of each destination in a contiguous block. This way, the
+    contributions of all midpoints of a node pair are two column slices.
+
+    This requires SciPy to be installed.
+    """
+
+    def __init__(self, shortest_paths: ShortestPaths) -> None:
+        num_nodes = shortest_paths.num_nodes
+        matrix = routing_matrix(shortest_paths)
+
+        self.num_nodes = num_nodes
+        self.distances = shortest_paths.distances
+        # Column `s * num_nodes + t` belongs to the pair `(s, t)`
+        self._by_src = matrix.tocsc()
+        # Column `t * num_nodes + s` belongs to the pair `(s, t)`
+        by_dest_order = np.arange(num_nodes * num_nodes).reshape(num_nodes, num_nodes).T.ravel()
+        self._by_dest = self._by_src[:, by_dest_order].tocsc()
+
+    def segment_loads(self, src: int, dest: int) -> np.ndarray:
+        """Per-edge loads of one unit of traffic on the shortest paths from `src` to `dest`"""
+        return self._by_src[:, src * self.num_nodes + dest].toarray().ravel()
+
+    def two_segment_loads(self, src: int, dest: int) -> np.ndarray:
+        """
+        Per-edge loads of one unit of traffic from `src` to `dest` for every
+        midpoint, as an array of shape `(num_nodes, num_edges)` with one row
+        per midpoint. Rows of midpoints through which `dest` is unreachable
+        are all zero; see `valid_midpoints()`.
+        """
+        n = self.num_nodes
+        first = self._by_src[:, src * n : (src + 1) * n]
+        second = self._by_dest[:, dest * n : (dest + 1) * n]
+        loads = (first + second).T.toarray()
+        # Only one of the segments of an invalid midpoint may carry traffic
+        loads[~self.valid_midpoints(src, dest)] = 0.0
+        return loads
+
+    def valid_midpoints(self, src: int, dest: int) -> np.ndarray:
+        """Mask of midpoints via which `dest` can be reached from `src`"""
+        return np.isfinite(self.distances[src, :]) & np.isfinite(self.distances[:, dest])
+
+    def score_midpoints(
+        self, src: int, dest: int, volume: float, loads: np.ndarray, bandwidth: np.ndarray
+    ) -> np.ndarray:
+        """
+        Maximum link utilization for each midpoint if `volume` traffic from
+        `src` to `dest` is added on top of `loads`. Invalid midpoints score
+        `np.inf`.
+        """
+        candidate_loads = loads[np.newaxis, :] + volume * self.two_segment_loads(src, dest)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilization = np.where(candidate_loads > 0, candidate_loads / bandwidth[np.newaxis, :], 0.0)
+
+        if utilization.shape[1] > 0:
+            scores = utilization.max(axis=1)
+        else:
+            scores = np.zeros(self.num_nodes)
+        scores[~self.valid_midpoints(src, dest)] = np.inf
+        return scores
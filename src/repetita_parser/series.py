@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from repetita_parser import demands, topology
+from repetita_parser.cache import ParseCache
+from repetita_parser.instance import Instance, _aggregate_demands, _validate
+from repetita_parser.types import PathLike
+from repetita_parser.utils import snapshot_files
+
+
+class InstanceSeries:
+    """
+    A topology together with multiple demand snapshots, e.g., the
+    `DeutscheTelekom.graph` file and all `DeutscheTelekom.NNNN.demands` files
+    of a REPETITA dataset. The topology is parsed only once.
+
+    Demand files are parsed on a process pool with up to `max_workers`
+    processes (defaulting to the number of CPUs). Pass `max_workers=1` to parse
+    them sequentially in the current process. With `validate=False`, the
+    demands are not checked against the topology, and snapshots obtained
+    through indexing are not validated either.
+    """
+
+    def __init__(
+        self,
+        topology_file: PathLike,
+        demands_files: Sequence[PathLike],
+        strict: bool = True,
+        cache: Optional[ParseCache] = None,
+        max_workers: Optional[int] = None,
+        tm_dtype: DTypeLike = np.float64,
+        validate: bool = True,
+    ) -> None:
+        parse_topology = cache.parse_topology if cache is not None else topology.parse
+        parse_demands = cache.parse_demands if cache is not None else demands.parse
+
+        self.topology: topology.Topology = parse_topology(topology_file, strict=strict)
+
+        self.demands: List[demands.Demands]
+        if max_workers == 1 or len(demands_files) <= 1:
+            self.demands = [parse_demands(f, strict=strict) for f in demands_files]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                self.demands = list(executor.map(parse_demands, demands_files, [strict] * len(demands_files)))
+
+        if validate:
+            for dems in self.demands:
+                _validate(self.topology, dems)
+
+        self.tm_dtype = tm_dtype
+        self.validate = validate
+        self._traffic_tensor: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_directory(cls, directory: PathLike, name: str, **kwargs) -> "InstanceSeries":
+        """
+        Load `<name>.graph` and all `<name>.<index>.demands` files from
+        `directory`. Snapshots are ordered by file name. Keyword arguments are passed on to
+        `__init__()`.
+        """
+        directory = Path(os.fsdecode(directory))
+        demands_files = snapshot_files(directory, name)
+        return cls(directory / f"{name}.graph", demands_files, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.demands)
+
+    def __getitem__(self, snapshot: int) -> Instance:
+        """Instance for a single snapshot, sharing this series' topology"""
+        return Instance.from_parsed(
+            self.topology, self.demands[snapshot], tm_dtype=self.tm_dtype, validate=self.validate
+        )
+
+    def __iter__(self) -> Iterator[Instance]:
+        for snapshot in range(len(self)):
+            yield self[snapshot]
+
+    @property
+    def traffic_tensor(self) -> np.ndarray:
+        """
+        Traffic matrices of all snapshots stacked into an array of shape
+        `(num_snapshots, num_nodes, num_nodes)`, i.e., the total traffic from
+        node `i` to node `j` in snapshot `t` is at `traffic_tensor[t, i, j]`.
+        The tensor is built on first access.
+        """
+        if self._traffic_tensor is None:
+            num_nodes = self.topology.num_nodes
+            tensor = np.zeros(shape=(len(self.demands), num_nodes, num_nodes), dtype=self.tm_dtype)
+            for snapshot, dems in enumerate(self.demands):
+                src, dest, bandwidths = _aggregate_demands(num_nodes, dems)
+                tensor[snapshot, src, dest] = bandwidths
+            self._traffic_tensor = tensor
+        return self._traffic_tensor
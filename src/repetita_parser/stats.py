@@ -0,0 +1,91 @@
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import IO, Callable, ContextManager, Iterator, List, Optional
+
+
+@dataclass
+class PhaseStats:
+    """
+    Measurements of a single phase, e.g., `"topology.edges"`. `bytes_read`
+    counts decoded characters, i.e., bytes for ASCII input, and is `None` if
+    it cannot be determined. `peak_bytes` is the peak memory allocated during
+    the phase and only set if memory tracing is enabled.
+    """
+
+    name: str
+    seconds: float = 0.0
+    lines: int = 0
+    comment_lines: int = 0
+    bytes_read: Optional[int] = None
+    peak_bytes: Optional[int] = None
+
+
+@dataclass
+class ParseStats:
+    """
+    Collects `PhaseStats` from the functions it is passed to, in the order the
+    phases finish. `callback` is called with each finished phase.
+
+    With `trace_memory`, allocations are traced with `tracemalloc` during
+    every phase, which slows parsing down considerably.
+    """
+
+    callback: Optional[Callable[[PhaseStats], None]] = None
+    trace_memory: bool = False
+    phases: List[PhaseStats] = field(default_factory=list)
+
+    def __getitem__(self, name: str) -> PhaseStats:
+        """Latest phase called `name`"""
+        for phase_stats in reversed(self.phases):
+            if phase_stats.name == name:
+                return phase_stats
+        raise KeyError(name)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase_stats.seconds for phase_stats in self.phases)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseStats]:
+        """Measure the wall time (and memory) of the enclosed block as phase `name`"""
+        phase_stats = PhaseStats(name)
+
+        started_tracing = False
+        base_memory = 0
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base_memory = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            yield phase_stats
+        finally:
+            phase_stats.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                phase_stats.peak_bytes = tracemalloc.get_traced_memory()[1] - base_memory
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.phases.append(phase_stats)
+            if self.callback is not None:
+                self.callback(phase_stats)
+
+
+def phase(stats: Optional[ParseStats], name: str) -> ContextManager[Optional[PhaseStats]]:
+    """`stats.phase(name)`, or a no-op yielding `None` if `stats` is `None`"""
+    if stats is None:
+        return nullcontext()
+    return stats.phase(name)
+
+
+def stream_position(stream: IO) -> Optional[int]:
+    """Position of `stream` for computing `PhaseStats.bytes_read`, if it has one"""
+    try:
+        return stream.tell()
+    except (OSError, ValueError):
+        return None
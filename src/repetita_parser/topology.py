@@ -1,10 +1,24 @@
-import io
 from dataclasses import dataclass
-from typing import List
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from repetita_parser.errors import ParseError
-from repetita_parser.types import PathLike
-from repetita_parser.utils import has_inline_comment, is_comment_line
+from repetita_parser.routing import ShortestPaths, compute_shortest_paths
+from repetita_parser.stats import ParseStats, PhaseStats, phase, stream_position
+from repetita_parser.types import ExportTarget, ParseSource, PathLike
+from repetita_parser.utils import (
+    column_chunks,
+    columns_equal,
+    format_rows,
+    group_indices,
+    has_inline_comment,
+    is_comment_line,
+    list_chunks,
+    open_export_target,
+    open_source,
+    resolve_source_name,
+)
 
 try:
     import networkx as nx
@@ -18,7 +32,11 @@ EDGES_ID = "EDGES"
 NODES_MEMO_LINE = "label x y\n"
 EDGES_MEMO_LINE = "label src dest weight bw delay\n"
 
+_NO_INDICES = np.zeros(0, dtype=np.int64)
+_NO_INDICES.flags.writeable = False
 
+# Number of weight vectors for which shortest paths are cached per topology
+_MAX_CACHED_SHORTEST_PATHS = 4
 
 
 @dataclass
@@ -38,25 +56,284 @@ class Edge:
     delay: float
 
 
+@dataclass
+class NodeColumns:
+    """
+    Column-wise representation of a list of nodes. Entry `i` of each array
+    belongs to the node with index `i`.
+    """
+
+    label: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @classmethod
+    def from_list(cls, nodes: List[Node]) -> "NodeColumns":
+        return cls(
+            np.array([n.label for n in nodes], dtype=str),
+            np.fromiter((n.x for n in nodes), dtype=np.float64, count=len(nodes)),
+            np.fromiter((n.y for n in nodes), dtype=np.float64, count=len(nodes)),
+        )
+
+    def to_list(self) -> List[Node]:
+        return [Node(label, x, y) for label, x, y in zip(self.label.tolist(), self.x.tolist(), self.y.tolist())]
+
+
+@dataclass
+class EdgeColumns:
+    """
+    Column-wise representation of a list of edges. Entry `i` of each array
+    belongs to the edge with index `i`.
+    """
+
+    label: np.ndarray
+    src: np.ndarray
+    dest: np.ndarray
+    weight: np.ndarray
+    bandwidth: np.ndarray
+    delay: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    @classmethod
+    def from_list(cls, edges: List[Edge]) -> "EdgeColumns":
+        return cls(
+            np.array([e.label for e in edges], dtype=str),
+            np.fromiter((e.src for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((e.dest for e in edges), dtype=np.int64, count=len(edges)),
+            np.fromiter((e.weight for e in edges), dtype=np.float64, count=len(edges)),
+            np.fromiter((e.bandwidth for e in edges), dtype=np.float64, count=len(edges)),
+            np.fromiter((e.delay for e in edges), dtype=np.float64, count=len(edges)),
+        )
+
+    def to_list(self) -> List[Edge]:
+        return [
+            Edge(*fields)
+            for fields in zip(
+                self.label.tolist(),
+                self.src.tolist(),
+                self.dest.tolist(),
+                self.weight.tolist(),
+                self.bandwidth.tolist(),
+                self.delay.tolist(),
+            )
+        ]
+
+
+@dataclass
+class Adjacency:
+    """
+    Compressed sparse row (CSR) adjacency structure of a topology. The
+    outgoing edges of node `i` are `out_edges[out_offsets[i]:out_offsets[i + 1]]`
+    with the respective destination nodes in `out_neighbors` at the same
+    positions. Incoming edges are stored analogously in the `in_*` arrays.
+    Edge ids are indices into `Topology.edges`, and edges of a node are
+    ordered by their id.
+    """
+
+    out_offsets: np.ndarray
+    out_neighbors: np.ndarray
+    out_edges: np.ndarray
+    in_offsets: np.ndarray
+    in_neighbors: np.ndarray
+    in_edges: np.ndarray
+
+    @classmethod
+    def from_edges(cls, num_nodes: int, src: np.ndarray, dest: np.ndarray) -> "Adjacency":
+        invalid = (src < 0) | (src >= num_nodes) | (dest < 0) | (dest >= num_nodes)
+        if np.any(invalid):
+            edge_id = int(np.flatnonzero(invalid)[0])
+            msg = f"edge {edge_id} references a node index that does not exist in topology"
+            raise ValueError(msg)
+
+        out_edges = np.argsort(src, kind="stable")
+        in_edges = np.argsort(dest, kind="stable")
+        out_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_nodes), out=out_offsets[1:])
+        in_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dest, minlength=num_nodes), out=in_offsets[1:])
+
+        arrays = (out_offsets, dest[out_edges], out_edges, in_offsets, src[in_edges], in_edges)
+        for array in arrays:
+            # Adjacency structures are cached and shared
+            array.flags.writeable = False
+        return cls(*arrays)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.out_offsets) - 1
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.out_offsets)
+
+    def in_degree(self) -> np.ndarray:
+        return np.diff(self.in_offsets)
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.out_neighbors[self.out_offsets[node] : self.out_offsets[node + 1]]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        return self.in_neighbors[self.in_offsets[node] : self.in_offsets[node + 1]]
+
+    def edges_from(self, node: int) -> np.ndarray:
+        return self.out_edges[self.out_offsets[node] : self.out_offsets[node + 1]]
+
+    def edges_to(self, node: int) -> np.ndarray:
+        return self.in_edges[self.in_offsets[node] : self.in_offsets[node + 1]]
+
+
 class Topology:
+    """
+    Network topology. Nodes and edges are available both as lists of `Node`
+    and `Edge` objects (`Topology.nodes`, `Topology.edges`) and column-wise as
+    NumPy arrays (`Topology.node_columns`, `Topology.edge_columns`).
+    Whichever representation is missing is built on first access; modifying
+    the lists afterwards is not reflected in the columns or in any of the
+    lookup structures derived from them.
+    """
+
     def __init__(self, nodes: List[Node], edges: List[Edge], source_file: PathLike) -> None:
-        self.nodes: List[Node] = nodes
-        self.edges: List[Edge] = edges
+        self._nodes: Optional[List[Node]] = nodes
+        self._edges: Optional[List[Edge]] = edges
+        self._node_columns: Optional[NodeColumns] = None
+        self._edge_columns: Optional[EdgeColumns] = None
+        self._derived: Dict[str, Any] = {}
 
         self.source_file = source_file
 
+    @classmethod
+    def from_columns(cls, nodes: NodeColumns, edges: EdgeColumns, source_file: PathLike) -> "Topology":
+        retval = cls.__new__(cls)
+        retval._nodes = None
+        retval._edges = None
+        retval._node_columns = nodes
+        retval._edge_columns = edges
+        retval._derived = {}
+        retval.source_file = source_file
+        return retval
+
+    @property
+    def nodes(self) -> List[Node]:
+        if self._nodes is None:
+            assert self._node_columns is not None
+            self._nodes = self._node_columns.to_list()
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: List[Node]) -> None:
+        self._nodes = nodes
+        self._node_columns = None
+        self._derived.clear()
+
+    @property
+    def edges(self) -> List[Edge]:
+        if self._edges is None:
+            assert self._edge_columns is not None
+            self._edges = self._edge_columns.to_list()
+        return self._edges
+
+    @edges.setter
+    def edges(self, edges: List[Edge]) -> None:
+        self._edges = edges
+        self._edge_columns = None
+        self._derived.clear()
+
+    @property
+    def node_columns(self) -> NodeColumns:
+        if self._node_columns is None:
+            assert self._nodes is not None
+            self._node_columns = NodeColumns.from_list(self._nodes)
+        return self._node_columns
+
+    @property
+    def edge_columns(self) -> EdgeColumns:
+        if self._edge_columns is None:
+            assert self._edges is not None
+            self._edge_columns = EdgeColumns.from_list(self._edges)
+        return self._edge_columns
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._nodes) if self._nodes is not None else len(self.node_columns)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._edges) if self._edges is not None else len(self.edge_columns)
+
+    def node_index(self, label: str) -> int:
+        """
+        Index of the node with the given label. If multiple nodes share the
+        label, the first one is returned. Raises a `KeyError` if no node has
+        this label.
+        """
+        if "label_index" not in self._derived:
+            labels = self.node_columns.label.tolist()
+            # Iterate in reverse so that the first occurrence wins
+            self._derived["label_index"] = {label: idx for idx, label in reversed(list(enumerate(labels)))}
+        return self._derived["label_index"][label]
+
+    def edge_indices(self, src: int, dest: int) -> np.ndarray:
+        """Indices into `self.edges` of all edges from `src` to `dest`"""
+        if "edge_groups" not in self._derived:
+            self._derived["edge_groups"] = group_indices(self.edge_columns.src, self.edge_columns.dest)
+        return self._derived["edge_groups"].get((src, dest), _NO_INDICES)
+
+    @property
+    def adjacency(self) -> Adjacency:
+        """
+        CSR adjacency structure of the topology, built on first access. Raises
+        a `ValueError` if an edge references a node that does not exist.
+        """
+        if "adjacency" not in self._derived:
+            self._derived["adjacency"] = Adjacency.from_edges(
+                self.num_nodes, self.edge_columns.src, self.edge_columns.dest
+            )
+        return self._derived["adjacency"]
+
+    def shortest_paths(self, weights: Optional[np.ndarray] = None) -> ShortestPaths:
+        """
+        All-pairs shortest paths and ECMP splits under the given per-edge
+        weights, defaulting to the IGP weights in `self.edges`. Results for the
+        most recently used weight vectors are cached.
+        """
+        if weights is None:
+            weights = self.edge_columns.weight
+        weights = np.asarray(weights, dtype=np.float64)
+
+        cache = self._derived.setdefault("shortest_paths", {})
+        key = weights.tobytes()
+        if key in cache:
+            # Move to the end to mark it as most recently used
+            cache[key] = cache.pop(key)
+            return cache[key]
+
+        result = compute_shortest_paths(self.num_nodes, self.edge_columns.src, self.edge_columns.dest, weights)
+        cache[key] = result
+        if len(cache) > _MAX_CACHED_SHORTEST_PATHS:
+            del cache[next(iter(cache))]
+        return result
+
     def __eq__(self, other) -> bool:
         """
         Comparison for equality is only defined in terms of the topology
         structure, i.e., two instances can be equal although their source files
         differ.
         """
-        return all(
-            [
-                self.nodes == other.nodes,
-                self.edges == other.edges,
-            ]
-        )
+        if self._nodes is not None and other._nodes is not None:
+            nodes_equal = self._nodes == other._nodes
+        else:
+            nodes_equal = columns_equal(self.node_columns, other.node_columns)
+
+        if self._edges is not None and other._edges is not None:
+            edges_equal = self._edges == other._edges
+        else:
+            edges_equal = columns_equal(self.edge_columns, other.edge_columns)
+
+        return nodes_equal and edges_equal
 
     def __ne__(self, other) -> bool:
         """
@@ -90,47 +367,63 @@ class Topology:
 
             return graph
 
-    def export(self, target: io.TextIOBase) -> None:
-        # Write node info
-        target.writelines(
-            [
-                f"{NODES_ID} {len(self.nodes)}\n",
-                NODES_MEMO_LINE,
-            ]
-        )
-
-        target.writelines([f"{n.label} {n.x} {n.y}\n" for n in self.nodes])
-        target.write("\n")
-
-        # Write edge info
-        target.writelines(
-            [
-                f"{EDGES_ID} {len(self.edges)}\n",
-                EDGES_MEMO_LINE,
-            ]
-        )
-
-        target.writelines([f"{e.label} {e.src} {e.dest} {e.weight} {e.bandwidth} {e.delay}\n" for e in self.edges])
+    def export(self, target: ExportTarget) -> None:
+        """
+        Write the topology in REPETITA format to a text stream, a binary stream
+        or a file path. Paths ending in `.gz`, `.xz` or `.zst` are compressed
+        with gzip, xz or zstd, respectively; zstd requires the `zstandard`
+        package. Nodes and edges are formatted and written in chunks.
+        """
+        with open_export_target(target) as write:
+            # Write node info
+            write(f"{NODES_ID} {self.num_nodes}\n")
+            write(NODES_MEMO_LINE)
+            if self._nodes is not None:
+                for chunk in list_chunks(self._nodes):
+                    write("".join([f"{n.label} {n.x} {n.y}\n" for n in chunk]))
+            else:
+                assert self._node_columns is not None
+                for column_chunk in column_chunks(self._node_columns):
+                    write(format_rows(column_chunk))
+            write("\n")
+
+            # Write edge info
+            write(f"{EDGES_ID} {self.num_edges}\n")
+            write(EDGES_MEMO_LINE)
+            if self._edges is not None:
+                for edge_chunk in list_chunks(self._edges):
+                    write(
+                        "".join(
+                            [f"{e.label} {e.src} {e.dest} {e.weight} {e.bandwidth} {e.delay}\n" for e in edge_chunk]
+                        )
+                    )
+            else:
+                assert self._edge_columns is not None
+                for edge_column_chunk in column_chunks(self._edge_columns):
+                    write(format_rows(edge_column_chunk))
 
 
 @dataclass
 class _ParserState:
-    stream: io.TextIOWrapper
+    stream: IO[str]
     file_path: PathLike
     line_idx: int
     strict: bool
+    num_comment_lines: int = 0
 
     @property
     def line_num(self) -> int:
         return self.line_idx + 1
 
 
-def _parse_nodes(state: _ParserState) -> List[Node]:
+def _parse_nodes(state: _ParserState) -> NodeColumns:
     num_node_fields = 3
     # If this changes, we have to touch the impl
     assert len(NODES_MEMO_LINE.strip().split(" ")) == num_node_fields
 
-    nodes: List[Node] = []
+    labels: List[str] = []
+    xs: List[float] = []
+    ys: List[float] = []
     memo_line_processed = False
 
     # Nodes and edges are separated by a blank line
@@ -149,6 +442,7 @@ def _parse_nodes(state: _ParserState) -> List[Node]:
             if state.strict:
                 msg = "unexpected comment line in strict mode"
                 raise ParseError(msg, state.file_path, state.line_num)
+            state.num_comment_lines += 1
             continue
 
         # Check for inline comments (should fail in both modes)
@@ -168,21 +462,28 @@ def _parse_nodes(state: _ParserState) -> List[Node]:
             msg = "not all node fields present"
             raise ParseError(msg, state.file_path, state.line_num)
         else:
-            label = fields[0]
-            x = float(fields[1])
-            y = float(fields[2])
-
-            nodes.append(Node(label, x, y))
+            labels.append(fields[0])
+            xs.append(float(fields[1]))
+            ys.append(float(fields[2]))
 
-    return nodes
+    return NodeColumns(
+        np.array(labels, dtype=str),
+        np.array(xs, dtype=np.float64),
+        np.array(ys, dtype=np.float64),
+    )
 
 
-def _parse_edges(state: _ParserState) -> List[Edge]:
+def _parse_edges(state: _ParserState) -> EdgeColumns:
     num_edge_fields = 6
     # If this changes, we have to touch the impl
     assert num_edge_fields == len(EDGES_MEMO_LINE.strip().split(" "))
 
-    edges: List[Edge] = []
+    labels: List[str] = []
+    srcs: List[int] = []
+    dests: List[int] = []
+    weights: List[float] = []
+    bws: List[float] = []
+    delays: List[float] = []
     memo_line_processed = False
 
     # At EOF, we read an empty string which is falsey
@@ -198,6 +499,7 @@ def _parse_edges(state: _ParserState) -> List[Edge]:
             if state.strict:
                 msg = "unexpected comment line in strict mode"
                 raise ParseError(msg, state.file_path, state.line_num)
+            state.num_comment_lines += 1
             continue
 
         # Check for inline comments (should fail in both modes)
@@ -218,77 +520,140 @@ def _parse_edges(state: _ParserState) -> List[Edge]:
                 msg = "not all edge fields present"
                 raise ParseError(msg, state.file_path, state.line_num)
 
-            label = fields[0]
-            src = int(fields[1])
-            dest = int(fields[2])
-            weight = float(fields[3])
-            bw = float(fields[4])
-            delay = float(fields[5])
-
-            edges.append(Edge(label, src, dest, weight, bw, delay))
-
-    return edges
-
-
-def parse(file_path: PathLike, strict: bool = True) -> Topology:
-    with open(file_path) as f:
-        cur_line_idx = 0
+            labels.append(fields[0])
+            srcs.append(int(fields[1]))
+            dests.append(int(fields[2]))
+            weights.append(float(fields[3]))
+            bws.append(float(fields[4]))
+            delays.append(float(fields[5]))
+
+    return EdgeColumns(
+        np.array(labels, dtype=str),
+        np.array(srcs, dtype=np.int64),
+        np.array(dests, dtype=np.int64),
+        np.array(weights, dtype=np.float64),
+        np.array(bws, dtype=np.float64),
+        np.array(delays, dtype=np.float64),
+    )
+
+
+def parse(
+    file_path: ParseSource,
+    strict: bool = True,
+    source_name: Optional[str] = None,
+    stats: Optional[ParseStats] = None,
+) -> Topology:
+    """
+    Parse a topology from a file, which may be compressed (see
+    `utils.open_input()`), from an open text or binary stream, or from a
+    `bytes`-like buffer. Errors and the resulting `Topology` refer to the
+    source by `source_name` if given, or else by its path.
+
+    If `stats` are passed, the `"topology.nodes"` and `"topology.edges"`
+    phases are recorded in them.
+    """
+    with open_source(file_path) as f:
+        return _parse_stream(f, resolve_source_name(file_path, source_name), strict, stats)
+
+
+def _record_section(
+    phase_stats: Optional[PhaseStats], state: _ParserState, start: Tuple[int, int, Optional[int]]
+) -> None:
+    # `start` holds the line index, comment count and stream position at the
+    # beginning of the section
+    if phase_stats is None:
+        return
+
+    line_idx, num_comment_lines, position = start
+    phase_stats.lines = state.line_idx - line_idx
+    phase_stats.comment_lines = state.num_comment_lines - num_comment_lines
+    end_position = stream_position(state.stream)
+    if position is not None and end_position is not None:
+        phase_stats.bytes_read = end_position - position
+
+
+def _parse_stream(f: IO[str], file_path: PathLike, strict: bool, stats: Optional[ParseStats]) -> Topology:
+    state = _ParserState(f, file_path, 0, strict)
+    with phase(stats, "topology.nodes") as nodes_stats:
+        start = (0, 0, stream_position(f) if nodes_stats is not None else None)
+        nodes = _parse_node_section(state)
+        _record_section(nodes_stats, state, start)
+
+    with phase(stats, "topology.edges") as edges_stats:
+        start = (state.line_idx, state.num_comment_lines, stream_position(f) if edges_stats is not None else None)
+        edges = _parse_edge_section(state)
+        _record_section(edges_stats, state, start)
+
+    return Topology.from_columns(nodes, edges, file_path)
+
+
+def _parse_node_section(state: _ParserState) -> NodeColumns:
+    f = state.stream
+    file_path = state.file_path
+    strict = state.strict
+    cur_line_idx = 0
+
+    # Skip comments at the beginning and find NODES header
+    while True:
+        line = f.readline()
+        if not line:  # EOF
+            msg = "expected nodes header line"
+            raise ParseError(msg, file_path, cur_line_idx + 1)
 
-        # Skip comments at the beginning and find NODES header
-        while True:
-            line = f.readline()
-            if not line:  # EOF
-                msg = "expected nodes header line"
-                raise ParseError(msg, file_path, cur_line_idx + 1)
+        cur_line_idx += 1
 
-            cur_line_idx += 1
+        if is_comment_line(line):
+            if strict:
+                msg = "unexpected comment line in strict mode"
+                raise ParseError(msg, file_path, cur_line_idx)
+            state.num_comment_lines += 1
+            continue
 
-            if is_comment_line(line):
-                if strict:
-                    msg = "unexpected comment line in strict mode"
-                    raise ParseError(msg, file_path, cur_line_idx)
-                continue
+        # Check for inline comments in header line (should fail in both modes)
+        if has_inline_comment(line):
+            msg = "inline comments not allowed in header lines"
+            raise ParseError(msg, file_path, cur_line_idx)
 
-            # Check for inline comments in header line (should fail in both modes)
-            if has_inline_comment(line):
-                msg = "inline comments not allowed in header lines"
-                raise ParseError(msg, file_path, cur_line_idx)
+        fields = line.strip("\n").split()
+        if fields[0] != NODES_ID:
+            msg = "expected nodes header line"
+            raise ParseError(msg, file_path, cur_line_idx)
+        break
 
-            fields = line.strip("\n").split()
-            if fields[0] != NODES_ID:
-                msg = "expected nodes header line"
-                raise ParseError(msg, file_path, cur_line_idx)
-            break
+    state.line_idx = cur_line_idx
+    return _parse_nodes(state)
 
-        state = _ParserState(f, file_path, cur_line_idx, strict)
-        nodes = _parse_nodes(state)
 
-        # Skip comments and find EDGES header
-        while True:
-            line = f.readline()
-            if not line:  # EOF
-                msg = "expected edges header line"
-                raise ParseError(msg, file_path, state.line_idx + 1)
+def _parse_edge_section(state: _ParserState) -> EdgeColumns:
+    f = state.stream
+    file_path = state.file_path
+    strict = state.strict
 
-            state.line_idx += 1
+    # Skip comments and find EDGES header
+    while True:
+        line = f.readline()
+        if not line:  # EOF
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path, state.line_idx + 1)
 
-            if is_comment_line(line):
-                if strict:
-                    msg = "unexpected comment line in strict mode"
-                    raise ParseError(msg, file_path, state.line_num)
-                continue
+        state.line_idx += 1
 
-            # Check for inline comments in header line (should fail in both modes)
-            if has_inline_comment(line):
-                msg = "inline comments not allowed in header lines"
+        if is_comment_line(line):
+            if strict:
+                msg = "unexpected comment line in strict mode"
                 raise ParseError(msg, file_path, state.line_num)
+            state.num_comment_lines += 1
+            continue
 
-            fields = line.strip("\n").split()
-            if fields[0] != EDGES_ID:
-                msg = "expected edges header line"
-                raise ParseError(msg, file_path, state.line_num)
-            break
+        # Check for inline comments in header line (should fail in both modes)
+        if has_inline_comment(line):
+            msg = "inline comments not allowed in header lines"
+            raise ParseError(msg, file_path, state.line_num)
 
-        edges = _parse_edges(state)
+        fields = line.strip("\n").split()
+        if fields[0] != EDGES_ID:
+            msg = "expected edges header line"
+            raise ParseError(msg, file_path, state.line_num)
+        break
 
-        return Topology(nodes, edges, file_path)
+    return _parse_edges(state)
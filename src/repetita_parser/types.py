@@ -1,4 +1,6 @@
 import os
-from typing import TypeAlias, Union
+from typing import IO, TypeAlias, Union
 
 PathLike: TypeAlias = Union[str, bytes, os.PathLike]
+ExportTarget: TypeAlias = Union[PathLike, IO[str], IO[bytes]]
+ParseSource: TypeAlias = Union[PathLike, IO[str], IO[bytes], bytearray, memoryview]
@@ -1,3 +1,39 @@
+import glob
+import gzip
+import io
+import locale
+import lzma
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from contextlib import contextmanager
+from dataclasses import fields
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TypeVar, cast
+
+import numpy as np
+
+from repetita_parser.types import ExportTarget, ParseSource, PathLike
+
+try:
+    import zstandard
+
+    _has_zstandard = True
+except ImportError:
+    _has_zstandard = False
+
+# Number of rows that are formatted and written at once during export
+EXPORT_CHUNK_SIZE = 1 << 16
+# Buffer size for reading decompressed data
+READ_BUFFER_SIZE = 1 << 20
+
+_COMPRESSION_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+_COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\xfd7zXZ\x00": "xz", b"\x28\xb5\x2f\xfd": "zstd"}
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
 def is_comment_line(line: str) -> bool:
     """Check if a line is a comment (starts with # after optional whitespace)"""
     return line.strip().startswith("#")
@@ -9,3 +45,240 @@ def has_inline_comment(line: str) -> bool:
     if not stripped or stripped.startswith("#"):
         return False
     return "#" in stripped
+
+
+def columns_equal(lhs, rhs) -> bool:
+    """Check if two column dataclasses (e.g., `DemandColumns`) hold equal arrays"""
+    return all(np.array_equal(getattr(lhs, f.name), getattr(rhs, f.name)) for f in fields(lhs))
+
+
+def group_indices(*keys: np.ndarray) -> Dict[Any, np.ndarray]:
+    """
+    Group the indices `0, ..., len(keys[0]) - 1` by their key. With a single
+    key array, the groups are keyed by its values; with multiple key arrays,
+    they are keyed by tuples of values. Indices within a group are ascending.
+    The returned index arrays are read-only since they are meant to be cached.
+    """
+    if len(keys[0]) == 0:
+        return {}
+
+    # `np.lexsort()` sorts by its last key first
+    order = np.lexsort(keys[::-1])
+    order.flags.writeable = False
+    is_start = np.zeros(len(order), dtype=bool)
+    is_start[0] = True
+    for key in keys:
+        sorted_key = key[order]
+        is_start[1:] |= sorted_key[1:] != sorted_key[:-1]
+
+    starts = np.flatnonzero(is_start)
+    groups = np.split(order, starts[1:])
+    if len(keys) == 1:
+        return dict(zip(keys[0][order[starts]].tolist(), groups))
+    return dict(zip(zip(*(key[order[starts]].tolist() for key in keys)), groups))
+
+
+def snapshot_files(directory: Path, name: str) -> List[Path]:
+    """
+    Demand snapshots `<name>.<index>.demands` of topology `<name>` in
+    `directory`, ordered by file name. Snapshots of other topologies whose
+    names start with `<name>.`, e.g., `<name>.foo.0000.demands`, are excluded.
+    """
+    snapshot_name = re.compile(rf"{re.escape(name)}\.\d+\.demands")
+    candidates = directory.glob(f"{glob.escape(name)}.*.demands")
+    return sorted(p for p in candidates if snapshot_name.fullmatch(p.name))
+
+
+def chunked(items: Iterable[_T], chunksize: int) -> Iterator[List[_T]]:
+    """Split `items` into lists of `chunksize` items (the last one may be shorter)"""
+    chunk: List[_T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def map_unordered(
+    executor: Executor, fn: Callable[[_T], List[_R]], chunks: Iterable[_T], max_in_flight: int
+) -> Iterator[_R]:
+    """
+    Submit `fn(chunk)` for every chunk and yield the items of the returned
+    lists as the calls complete. At most `max_in_flight` calls are pending at
+    any time, so `chunks` is consumed lazily.
+    """
+    pending: Set[Future] = set()
+    for chunk in chunks:
+        if len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+        pending.add(executor.submit(fn, chunk))
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield from future.result()
+
+
+def _compression_from_suffix(file_path: PathLike) -> Optional[str]:
+    return _COMPRESSION_SUFFIXES.get(os.path.splitext(os.fsdecode(file_path))[1])
+
+
+def detect_compression(file_path: PathLike) -> Optional[str]:
+    """
+    Compression format (`"gzip"`, `"xz"` or `"zstd"`) of a file based on its
+    suffix or, failing that, its magic bytes. Returns `None` for uncompressed
+    files.
+    """
+    compression = _compression_from_suffix(file_path)
+    if compression is not None:
+        return compression
+
+    with open(file_path, "rb") as f:
+        head = f.read(max(len(magic) for magic in _COMPRESSION_MAGIC))
+    for magic, compression in _COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_compressed(file_path: PathLike, compression: str, mode: str) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.open(file_path, mode)  # type: ignore[return-value]
+    if compression == "xz":
+        return lzma.open(file_path, mode)  # type: ignore[return-value]
+
+    if not _has_zstandard:
+        msg = "zstandard is required to read and write zstd-compressed files"
+        raise ImportError(msg)
+    return zstandard.open(file_path, mode)
+
+
+def open_input(file_path: PathLike, binary: bool = False) -> IO:
+    """
+    Open a file for reading. gzip-, xz- and zstd-compressed files (see
+    `detect_compression()`) are decompressed on the fly without writing an
+    intermediate file.
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "rb" if binary else "r")
+
+    stream = io.BufferedReader(_open_compressed(file_path, compression, "rb"), READ_BUFFER_SIZE)  # type: ignore
+    return stream if binary else io.TextIOWrapper(stream)
+
+
+def is_path(source: ParseSource) -> bool:
+    """
+    Check if a parse source is a path rather than a stream or buffer. Since
+    paths may be given as `bytes`, `bytes` are treated as file contents only if
+    they contain a newline.
+    """
+    if isinstance(source, bytes):
+        return b"\n" not in source
+    return isinstance(source, (str, os.PathLike))
+
+
+def resolve_source_name(source: ParseSource, source_name: Optional[str]) -> PathLike:
+    """Name of a parse source used in errors: `source_name`, the path, or a placeholder"""
+    if source_name is not None:
+        return source_name
+    if is_path(source):
+        return source  # type: ignore[return-value]
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return "<buffer>"
+    return "<stream>"
+
+
+def decode_buffer(buffer: Any) -> str:
+    """
+    Decode a `bytes`-like buffer the way `open()` in text mode would, including
+    newline translation. The buffer is decoded in place without a copy.
+    """
+    text = str(buffer, locale.getpreferredencoding(False))
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@contextmanager
+def open_source(source: ParseSource) -> Iterator[IO[str]]:
+    """
+    Provide a text stream for a parse source, which can be a path (see
+    `open_input()`), a text or binary stream, or a `bytes`-like buffer. Streams
+    passed by the caller are not closed.
+    """
+    if is_path(source):
+        with open_input(source) as f:  # type: ignore[arg-type]
+            yield f
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.StringIO(decode_buffer(source))
+    elif isinstance(source, io.TextIOBase):
+        yield source  # type: ignore[misc]
+    else:
+        wrapper = io.TextIOWrapper(cast(IO[bytes], source))
+        try:
+            yield wrapper
+        finally:
+            # Keep the wrapper from closing the caller's stream
+            wrapper.detach()
+
+
+def read_source(source: ParseSource) -> str:
+    """Read all text of a parse source, see `open_source()`"""
+    if isinstance(source, (bytes, bytearray, memoryview)) and not is_path(source):
+        return decode_buffer(source)
+    with open_source(source) as f:
+        return f.read()
+
+
+@contextmanager
+def open_export_target(target: ExportTarget) -> Iterator[Callable[[str], Any]]:
+    """
+    Provide a function that writes text to `target`, which can be a text
+    stream, a binary stream or a path. Paths ending in `.gz`, `.xz` or `.zst`
+    are written compressed.
+    """
+    if isinstance(target, (str, bytes, os.PathLike)):
+        compression = _compression_from_suffix(target)
+        if compression is not None:
+            with io.TextIOWrapper(_open_compressed(target, compression, "wb")) as f:
+                yield f.write
+        else:
+            with open(target, "w") as f:
+                yield f.write
+    elif isinstance(target, (io.RawIOBase, io.BufferedIOBase)):
+        binary_target = target
+        yield lambda text: binary_target.write(text.encode())
+    else:
+        yield cast(IO[str], target).write
+
+
+def list_chunks(rows: Sequence[_T], chunksize: int = EXPORT_CHUNK_SIZE) -> Iterator[Sequence[_T]]:
+    """Split a list of rows into slices of up to `chunksize` rows for export"""
+    for start in range(0, len(rows), chunksize):
+        yield rows[start : start + chunksize]
+
+
+def column_chunks(columns: _T, chunksize: int = EXPORT_CHUNK_SIZE) -> Iterator[_T]:
+    """Split a column dataclass (e.g., `DemandColumns`) into chunks of up to `chunksize` rows"""
+    cls = type(columns)
+    num_rows = len(columns)  # type: ignore[arg-type]
+    for start in range(0, num_rows, chunksize):
+        yield cls(*(getattr(columns, f.name)[start : start + chunksize] for f in fields(cls)))  # type: ignore
+
+
+def format_rows(columns: Any) -> str:
+    """
+    Format a column dataclass as text with one space-separated line per row,
+    fields in declaration order. Values are converted to Python objects with
+    `tolist()` and then with `str()`, so the output is identical to formatting
+    the rows of the corresponding list with f-strings.
+    """
+    values = [getattr(columns, f.name).tolist() for f in fields(columns)]
+    row_format = " ".join(["%s"] * len(values)) + "\n"
+    return "".join([row_format % row for row in zip(*values)])
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import aio, demands, errors, topology
+from repetita_parser.instance import Instance
+
+
+def test_parse():
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return await asyncio.gather(
+                aio.parse_topology(TOPOLOGY_FILE_PATH, executor=executor),
+                aio.parse_demands(DEMANDS_FILE_PATH, executor=executor),
+            )
+
+    topo, dems = asyncio.run(main())
+    assert topo == topology.parse(TOPOLOGY_FILE_PATH)
+    assert dems == demands.parse(DEMANDS_FILE_PATH)
+
+
+def test_load_instance():
+    instance = asyncio.run(aio.load_instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH))
+    assert instance == Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+    with pytest.raises(errors.ValidationError):
+        asyncio.run(aio.load_instance(TOPOLOGY_FILE_PATH, "tests/data/validation/bad/src_bad.demands"))
+
+    with pytest.raises(errors.ParseError):
+        asyncio.run(aio.load_instance(TOPOLOGY_FILE_PATH, "tests/data/parsing/bad/bad_header.demands"))
+
+
+def test_cancellation(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_parse(file_path, strict=True):
+        started.set()
+        release.wait()
+        return topology.parse(file_path, strict)
+
+    monkeypatch.setattr(topology, "parse", blocking_parse)
+
+    async def main():
+        task = asyncio.ensure_future(aio.load_instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH))
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        release.set()
+
+    asyncio.run(main())
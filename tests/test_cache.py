@@ -0,0 +1,130 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import demands, topology
+from repetita_parser.cache import DEFAULT_CACHE_DIR_NAME, ParseCache
+from repetita_parser.instance import Instance
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copy(TOPOLOGY_FILE_PATH, tmp_path / "topo.graph")
+    shutil.copy(DEMANDS_FILE_PATH, tmp_path / "topo.0000.demands")
+    return tmp_path
+
+
+def test_roundtrip(data_dir, tmp_path_factory):
+    cache = ParseCache(tmp_path_factory.mktemp("cache"))
+    topo_file = data_dir / "topo.graph"
+    dems_file = data_dir / "topo.0000.demands"
+
+    # First call parses and stores, second call loads from the cache
+    assert cache.parse_topology(topo_file) == topology.parse(topo_file)
+    cached_topo = cache.parse_topology(topo_file)
+    assert isinstance(cached_topo.edge_columns.src, np.memmap)
+    assert cached_topo == topology.parse(topo_file)
+    assert cached_topo.source_file == topo_file
+
+    assert cache.parse_demands(dems_file) == demands.parse(dems_file)
+    cached_dems = cache.parse_demands(dems_file)
+    assert isinstance(cached_dems.columns.bandwidth, np.memmap)
+    assert cached_dems.list == demands.parse(dems_file).list
+
+
+def test_next_to_source(data_dir):
+    cache = ParseCache()
+    cache.parse_topology(data_dir / "topo.graph")
+
+    assert (data_dir / DEFAULT_CACHE_DIR_NAME).is_dir()
+
+
+def test_invalidation(data_dir, tmp_path_factory):
+    cache = ParseCache(tmp_path_factory.mktemp("cache"))
+    dems_file = data_dir / "topo.0000.demands"
+    cache.parse_demands(dems_file)
+
+    # Unchanged contents with a new modification time are still served
+    stat = dems_file.stat()
+    os.utime(dems_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert isinstance(cache.parse_demands(dems_file).columns.src, np.memmap)
+
+    # Same size, different contents
+    text = dems_file.read_text().replace("demand_0 0 1 26364", "demand_0 0 1 99999")
+    dems_file.write_text(text)
+    os.utime(dems_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+
+    reparsed = cache.parse_demands(dems_file)
+    assert not isinstance(reparsed.columns.src, np.memmap)
+    assert reparsed.list[0].bandwidth == 99999.0
+
+
+def test_modified_while_parsing(data_dir, tmp_path_factory, monkeypatch):
+    cache = ParseCache(tmp_path_factory.mktemp("cache"))
+    dems_file = data_dir / "topo.0000.demands"
+    stat = dems_file.stat()
+    parse = demands.parse
+
+    def parse_and_modify(*args, **kwargs):
+        # Rewrite the file at the same size after it has been read
+        parsed = parse(*args, **kwargs)
+        dems_file.write_text(dems_file.read_text().replace("demand_0 0 1 26364", "demand_0 0 1 99999"))
+        os.utime(dems_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        return parsed
+
+    with monkeypatch.context() as m:
+        m.setattr(demands, "parse", parse_and_modify)
+        assert cache.parse_demands(dems_file).list[0].bandwidth == 26364.0
+
+    # The outdated result was not stored
+    reparsed = cache.parse_demands(dems_file)
+    assert not isinstance(reparsed.columns.src, np.memmap)
+    assert reparsed.list[0].bandwidth == 99999.0
+
+
+def test_eviction(data_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    cache = ParseCache(cache_dir, max_size=1)
+
+    cache.parse_topology(data_dir / "topo.graph")
+    cache.parse_demands(data_dir / "topo.0000.demands")
+
+    # Only the most recently stored entry survives
+    assert len(list(cache_dir.iterdir())) == 1
+    assert isinstance(cache.parse_demands(data_dir / "topo.0000.demands").columns.src, np.memmap)
+
+
+def _parse_repeatedly(cache_dir, file_paths):
+    cache = ParseCache(cache_dir, max_size=1)
+    return [cache.parse_demands(file_path).list for _ in range(5) for file_path in file_paths]
+
+
+def test_concurrent_eviction(data_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    file_paths = [data_dir / f"topo.{i:04}.demands" for i in range(4)]
+    for file_path in file_paths[1:]:
+        shutil.copy(file_paths[0], file_path)
+    expected = demands.parse(file_paths[0]).list
+
+    # Every process keeps evicting the entries the others are reading
+    with ProcessPoolExecutor(4) as executor:
+        futures = [executor.submit(_parse_repeatedly, cache_dir, file_paths) for _ in range(4)]
+        for future in futures:
+            assert all(result == expected for result in future.result())
+
+
+def test_instance(data_dir, tmp_path_factory):
+    cache = ParseCache(tmp_path_factory.mktemp("cache"))
+    topo_file = data_dir / "topo.graph"
+    dems_file = data_dir / "topo.0000.demands"
+
+    uncached = Instance(topo_file, dems_file)
+    Instance(topo_file, dems_file, cache=cache)
+    cached = Instance(topo_file, dems_file, cache=cache)
+
+    assert cached == uncached
+    assert np.array_equal(cached.traffic_matrix, uncached.traffic_matrix)
@@ -1,9 +1,13 @@
+import gzip
+import io
+from functools import partial
 from pathlib import Path
 
+import numpy as np
 import pytest
 from paths import DEMANDS_FILE_PATH, EXPORT_DEMANDS_FILE_PATH
 
-from repetita_parser import demands, errors
+from repetita_parser import demands, errors, utils
 
 
 def test_parse():
@@ -25,6 +29,50 @@ def test_export():
     assert not (ground_truth_dems != import_dems)
 
 
+def test_export_formats(tmp_path, monkeypatch):
+    dem_list = demands.parse(DEMANDS_FILE_PATH).list
+    expected = f"DEMANDS {len(dem_list)}\n" + demands.DEMANDS_MEMO_LINE
+    expected += "".join(f"{d.label} {d.src} {d.dest} {d.bandwidth}\n" for d in dem_list)
+
+    # Chunked column export, list export and binary targets write the same text
+    monkeypatch.setattr(demands, "column_chunks", partial(utils.column_chunks, chunksize=100))
+    monkeypatch.setattr(demands, "list_chunks", partial(utils.list_chunks, chunksize=100))
+    dems = demands.parse(DEMANDS_FILE_PATH)
+    text = io.StringIO()
+    dems.export(text)
+    assert dems._list is None
+    assert text.getvalue() == expected
+
+    from_list = io.BytesIO()
+    demands.Demands(dem_list, DEMANDS_FILE_PATH).export(from_list)
+    assert from_list.getvalue() == expected.encode()
+
+    # Values of list-backed demands are written as they are
+    from_ints = io.StringIO()
+    demands.Demands([demands.Demand("a", 0, 1, 5)], "dems").export(from_ints)
+    assert from_ints.getvalue().endswith("\na 0 1 5\n")
+
+    dems.export(tmp_path / "exported.demands.gz")
+    with gzip.open(tmp_path / "exported.demands.gz", "rt") as f:
+        assert f.read() == expected
+
+
+def test_parse_streams_and_buffers():
+    expected = demands.parse(DEMANDS_FILE_PATH)
+    data = DEMANDS_FILE_PATH.read_bytes()
+
+    for source in [data, memoryview(data), io.BytesIO(data), io.StringIO(data.decode())]:
+        assert demands.parse(source) == expected
+    assert list(demands.iter_parse(memoryview(data))) == expected.list
+
+    with pytest.raises(errors.ParseError, match=r"^upload:3: not all demand fields present"):
+        demands.parse(b"DEMANDS 1\nlabel src dest bw\nd 0 1\n", source_name="upload")
+
+    # Named errors also come from the parallel parser
+    with pytest.raises(errors.ParseError, match=r"^upload:"):
+        demands.parse("tests/data/parsing/bad/bad_fields.demands", max_workers=2, source_name="upload")
+
+
 bad_root = Path("tests/data/parsing/bad")
 
 
@@ -39,3 +87,110 @@ bad_root = Path("tests/data/parsing/bad")
 def test_parse_errors(demands_file, expectation):
     with expectation:
         demands.parse(demands_file)
+
+
+def test_bulk_parse_matches_line_parse():
+    bulk = demands.parse(DEMANDS_FILE_PATH)
+
+    with open(DEMANDS_FILE_PATH) as f:
+        by_line = demands.Demands(demands._parse_lines(f, DEMANDS_FILE_PATH, strict=True), DEMANDS_FILE_PATH)
+
+    assert bulk == by_line
+    assert bulk.list == by_line.list
+    assert bulk.columns.src.dtype == np.int64
+    assert bulk.columns.bandwidth.dtype == np.float64
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "DEMANDS 1\nlabel src dest bw\n# comment\nd 0 1 1.0\n",
+        "DEMANDS 2\nlabel src dest bw\nd 0 1 1.0 2.0\ne 0 1\n",
+        "DEMANDS 1\nlabel src dest bw\n\nd 0 1 1.0\n",
+        "DEMANDS 1\nlabel src dest bw\nd 0 x 1.0\n",
+    ],
+)
+def test_bulk_parse_rejects(text):
+    assert demands._parse_bulk(text) is None
+
+
+def test_bulk_parse_fallback_line_number(tmp_path):
+    demands_file = tmp_path / "fallback.demands"
+    demands_file.write_text("DEMANDS 2\nlabel src dest bw\nd 0 1 1.0 2.0\ne 0 1\n")
+
+    with pytest.raises(errors.ParseError, match=r"fallback.demands:3: not all demand fields present"):
+        demands.parse(demands_file)
+
+
+def test_iter_parse():
+    parsed = demands.parse(DEMANDS_FILE_PATH)
+
+    assert list(demands.iter_parse(DEMANDS_FILE_PATH)) == parsed.list
+
+    batches = list(demands.iter_parse(DEMANDS_FILE_PATH, batch_size=100))
+    assert [len(b) for b in batches] == [100] * 8 + [70]
+    assert np.array_equal(np.concatenate([b.src for b in batches]), parsed.columns.src)
+    assert np.array_equal(np.concatenate([b.bandwidth for b in batches]), parsed.columns.bandwidth)
+    assert np.concatenate([b.label for b in batches]).tolist() == parsed.columns.label.tolist()
+
+
+def test_iter_parse_errors():
+    with pytest.raises(errors.ParseError, match="expected demands memo line"):
+        list(demands.iter_parse(bad_root / "bad_memo.demands"))
+
+    with pytest.raises(errors.ParseError, match="not all demand fields present"):
+        list(demands.iter_parse(bad_root / "bad_fields.demands", batch_size=10))
+
+    with pytest.raises(ValueError, match="batch_size must be positive"):
+        demands.iter_parse(DEMANDS_FILE_PATH, batch_size=0)
+
+
+@pytest.mark.parametrize(
+    "demands_file",
+    [
+        DEMANDS_FILE_PATH,
+        Path("tests/data/comments/demands_comments_interspersed.demands"),
+        Path("tests/data/comments/demands_whitespace_comments.demands"),
+    ],
+)
+def test_parse_parallel(demands_file):
+    assert demands.parse(demands_file, strict=False, max_workers=2) == demands.parse(demands_file, strict=False)
+
+
+@pytest.mark.parametrize(
+    "demands_file",
+    [
+        Path("tests/data/comments/demands_comments_start.demands"),
+        Path("tests/data/comments/demands_comments_interspersed.demands"),
+        bad_root / "bad_header.demands",
+        bad_root / "bad_memo.demands",
+        bad_root / "bad_fields.demands",
+    ],
+)
+def test_parse_parallel_errors(demands_file):
+    with pytest.raises(errors.ParseError) as expected:
+        demands.parse(demands_file)
+
+    with pytest.raises(errors.ParseError) as actual:
+        demands.parse(demands_file, max_workers=2)
+
+    assert str(actual.value) == str(expected.value)
+
+
+def test_parse_parallel_line_numbers(tmp_path):
+    # Errors far into the file have to carry absolute line numbers
+    demands_file = tmp_path / "large.demands"
+    lines = [f"demand_{i} 0 1 1.0\n" for i in range(1000)]
+    lines[789] = "demand_789 0 1\n"
+    demands_file.write_text("DEMANDS 1000\nlabel src dest bw\n" + "".join(lines))
+
+    with pytest.raises(errors.ParseError, match=r"large.demands:792: not all demand fields present"):
+        demands.parse(demands_file, max_workers=4)
+
+
+def test_lookup():
+    dems = demands.parse(DEMANDS_FILE_PATH)
+
+    for node in [0, 5, 29, 100]:
+        assert dems.indices_from(node).tolist() == [idx for idx, d in enumerate(dems.list) if d.src == node]
+        assert dems.indices_to(node).tolist() == [idx for idx, d in enumerate(dems.list) if d.dest == node]
@@ -1,6 +1,7 @@
+import pickle
 from pathlib import Path
 
-from repetita_parser.errors import ParseError
+from repetita_parser.errors import ParseError, ValidationError
 
 
 def test_str_rep():
@@ -13,3 +14,14 @@ def test_str_rep():
 
     msg_fp_ln = ParseError("message", dummy_path, 1)
     assert str(msg_fp_ln) == "foo/file.txt:1: message"
+
+
+def test_pickle():
+    parse_error = pickle.loads(pickle.dumps(ParseError("message", Path("foo/file.txt"), 1)))  # noqa: S301
+    assert str(parse_error) == "foo/file.txt:1: message"
+
+    validation_error = pickle.loads(pickle.dumps(ValidationError("message", "topo", "demands", ["d"])))  # noqa: S301
+    assert str(validation_error) == "message"
+    assert validation_error.topo_path == "topo"
+    assert validation_error.demands_path == "demands"
+    assert validation_error.demand_labels == ["d"]
@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import failures, routing
+from repetita_parser.instance import Instance
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+
+def _expected_loads(instance, failed_edges):
+    cols = instance.topology.edge_columns
+    weights = cols.weight.copy()
+    alive = np.ones(len(weights), dtype=bool)
+    alive[list(failed_edges)] = False
+
+    sp = routing.compute_shortest_paths(instance.topology.num_nodes, cols.src[alive], cols.dest[alive], weights[alive])
+    loads = np.zeros(len(weights))
+    loads[alive] = routing.route(sp, instance.traffic_matrix)
+    return loads
+
+
+@pytest.mark.parametrize("max_workers, chunksize", [(1, 1), (2, 8)])
+def test_single_edge_failures(instance, max_workers, chunksize):
+    results = list(failures.analyze(instance, max_workers=max_workers, chunksize=chunksize))
+
+    assert sorted(r.failed_edges for r in results) == [(e,) for e in range(110)]
+    for r in results[:10]:
+        assert r.link_loads.loads[r.failed_edges[0]] == 0.0
+        assert np.allclose(r.link_loads.loads, _expected_loads(instance, r.failed_edges))
+        assert r.max_utilization == r.link_loads.utilization.max()
+
+
+def test_group_failures(instance):
+    # Failing all edges leaving node 0 disconnects it from the other nodes
+    group = instance.topology.adjacency.edges_from(0).tolist()
+    (result,) = failures.analyze(instance, failures.group_failures([group]), max_workers=1)
+
+    g = instance.topology.as_nx_graph()
+    g.remove_edges_from([(0, int(v)) for v in instance.topology.adjacency.successors(0)])
+    reachable = nx.to_numpy_array(nx.transitive_closure(g, reflexive=True), nodelist=range(30), weight=None) > 0
+
+    assert result.failed_edges == tuple(group)
+    assert result.unrouted == pytest.approx(instance.traffic_matrix[~reachable].sum())
+    assert result.unrouted >= instance.traffic_matrix[0, 1:].sum()
+    assert np.allclose(result.link_loads.loads, _expected_loads(instance, group))
@@ -0,0 +1,72 @@
+import io
+
+import numpy as np
+import pytest
+
+from repetita_parser import demands, generator, topology
+from repetita_parser.instance import Instance
+
+
+@pytest.mark.parametrize("model", generator.GRAPH_MODELS)
+def test_generate_topology(model):
+    topo = generator.generate_topology(50, degree=4, model=model, seed=1)
+    edges = topo.edge_columns
+
+    assert topo.num_nodes == 50
+    assert topo == generator.generate_topology(50, degree=4, model=model, seed=1)
+    assert topo != generator.generate_topology(50, degree=4, model=model, seed=2)
+
+    # Every link consists of one edge in each direction
+    assert np.array_equal(edges.src[0::2], edges.dest[1::2])
+    assert np.array_equal(edges.dest[0::2], edges.src[1::2])
+    assert not np.any(edges.src == edges.dest)
+
+    # Exported topologies can be parsed again
+    text = io.StringIO()
+    topo.export(text)
+    assert topology.parse(text.getvalue().encode()) == topo
+
+
+def test_random_topology_connected():
+    topo = generator.generate_topology(100, degree=2, seed=0)
+    assert np.isfinite(topo.shortest_paths().distances).all()
+
+
+@pytest.mark.parametrize("model", generator.TRAFFIC_MODELS)
+def test_generate_demands(model, monkeypatch):
+    # Use small chunks to cover chunked generation
+    monkeypatch.setattr(generator, "_CHUNK_SIZE", 1000)
+    topo = generator.generate_topology(30, seed=0)
+    dems = generator.generate_demands(topo, 2500, model=model, seed=3)
+    columns = dems.columns
+
+    assert len(dems) == 2500
+    assert len(np.unique(columns.label)) == 2500
+    assert not np.any(columns.src == columns.dest)
+    Instance.from_parsed(topo, dems)
+
+    # Writing yields the same demands
+    text = io.StringIO()
+    generator.write_demands(text, topo, 2500, model=model, seed=3)
+    assert demands.parse(text.getvalue().encode()) == dems
+
+
+def test_gravity_masses():
+    topo = generator.generate_topology(20, seed=0)
+    # Nodes without outgoing bandwidth have no mass and thus no traffic
+    edges = topo.edge_columns
+    topo.edge_columns.bandwidth[edges.src == 0] = 0.0
+
+    dems = generator.generate_demands(topo, 10000, model="gravity", seed=0)
+    assert not np.any(dems.columns.src == 0)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="unknown model"):
+        generator.generate_topology(10, model="tree")
+    with pytest.raises(ValueError, match="at least two nodes"):
+        generator.generate_topology(1)
+
+    topo = generator.generate_topology(10)
+    with pytest.raises(ValueError, match="unknown model"):
+        generator.write_demands(io.StringIO(), topo, 10, model="hotspot")
@@ -1,11 +1,13 @@
 from contextlib import nullcontext as does_not_raise
 from pathlib import Path
 
+import numpy as np
 import pytest
 from paths import DEMANDS_FILE_PATH, EXPORT_INSTANCE_DIR, TOPOLOGY_FILE_PATH
 
-from repetita_parser import errors
-from repetita_parser.instance import Instance
+from repetita_parser import demands, errors, instance, topology
+from repetita_parser.cache import ParseCache
+from repetita_parser.instance import Instance, _build_tm
 
 
 def test_instance():
@@ -32,6 +34,22 @@ def test_export():
     assert not (ground_truth != imported)
 
 
+def test_parse_buffers(tmp_path):
+    expected = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+    instance = Instance(
+        TOPOLOGY_FILE_PATH.read_bytes(),
+        memoryview(DEMANDS_FILE_PATH.read_bytes()),
+        cache=ParseCache(tmp_path),
+        topology_name="topology upload",
+        demands_name="demands upload",
+    )
+
+    assert instance == expected
+    assert instance.topology.source_file == "topology upload"
+    assert instance.demands.source_file == "demands upload"
+    assert not any(tmp_path.iterdir())
+
+
 bad_root = Path("tests/data/validation/bad")
 
 
@@ -59,3 +77,77 @@ bad_root = Path("tests/data/validation/bad")
 def test_validation(topo_file, demand_file, expectation):
     with expectation:
         Instance(topo_file, demand_file)
+
+
+def test_validation_reports_all_demands():
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+    dems = demands.parse(DEMANDS_FILE_PATH)
+    columns = dems.columns
+    src = columns.src.copy()
+    dest = columns.dest.copy()
+    src[[3, 7]] = [30, -1]
+    dest[[7, 12]] = [31, 4711]
+    bad_dems = demands.Demands.from_columns(
+        demands.DemandColumns(columns.label, src, dest, columns.bandwidth), DEMANDS_FILE_PATH
+    )
+
+    with pytest.raises(errors.ValidationError) as exc_info:
+        Instance.from_parsed(topo, bad_dems)
+
+    labels = columns.label[[3, 7, 12]].tolist()
+    assert exc_info.value.demand_labels == labels
+    assert f"demand {labels[0]}: node index 30 does not exist" in str(exc_info.value)
+    assert f"demand {labels[1]}: node indices -1, 31 do not exist" in str(exc_info.value)
+
+    # Validation can be skipped and run later
+    deferred = Instance.from_parsed(topo, bad_dems, validate=False)
+    with pytest.raises(errors.ValidationError):
+        deferred.validate()
+
+    Instance(TOPOLOGY_FILE_PATH, bad_root / "src_bad.demands", validate=False)
+
+    # Out-of-range indices are not silently attributed to other node pairs
+    with pytest.raises(IndexError, match="node index -1 is out of bounds for a topology with 30 nodes"):
+        deferred.traffic_matrix  # noqa: B018
+    too_high = demands.Demands([demands.Demand("d", 1, 30, 1.0)], "dems")
+    with pytest.raises(IndexError, match="node index 30 is out of bounds"):
+        Instance.from_parsed(topo, too_high, validate=False).traffic_matrix  # noqa: B018
+
+
+def test_traffic_matrix():
+    i = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+    expected = np.zeros((30, 30))
+    for d in i.demands.list:
+        expected[d.src, d.dest] += d.bandwidth
+
+    assert i._traffic_matrix is None
+    assert np.array_equal(i.traffic_matrix, expected)
+    assert i.traffic_matrix is i.traffic_matrix
+
+    sparse = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH, sparse_tm=True, tm_dtype=np.float32)
+    assert sparse.traffic_matrix.dtype == np.float32
+    assert sparse.traffic_matrix.nnz == np.count_nonzero(expected)
+    assert np.allclose(sparse.traffic_matrix.toarray(), expected)
+
+
+def test_traffic_matrix_duplicates():
+    topo = topology.Topology([topology.Node(str(i), 0.0, 0.0) for i in range(3)], [], "topo")
+    dems = demands.Demands(
+        [demands.Demand("a", 0, 1, 1.0), demands.Demand("b", 2, 0, 2.0), demands.Demand("c", 0, 1, 3.0)], "dems"
+    )
+
+    tm = _build_tm(topo, dems)
+    assert tm[0, 1] == 4.0
+    assert tm[2, 0] == 2.0
+    assert tm.sum() == 6.0
+
+    assert np.array_equal(_build_tm(topo, dems, sparse=True).toarray(), tm)
+
+
+def test_no_scipy(monkeypatch):
+    monkeypatch.setattr(instance, "_has_scipy", False)
+
+    i = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH, sparse_tm=True)
+    with pytest.raises(ImportError, match="SciPy is required to build a sparse traffic matrix"):
+        i.traffic_matrix  # noqa: B018
@@ -0,0 +1,66 @@
+import shutil
+
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import errors, loader
+from repetita_parser.instance import Instance
+
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    for name in ["a", "b"]:
+        instance_dir = tmp_path / name
+        instance_dir.mkdir()
+        shutil.copy(TOPOLOGY_FILE_PATH, instance_dir / f"{name}.graph")
+        shutil.copy(DEMANDS_FILE_PATH, instance_dir / f"{name}.0000.demands")
+        shutil.copy(DEMANDS_FILE_PATH, instance_dir / f"{name}.0001.demands")
+
+    shutil.copy("tests/data/validation/bad/src_bad.demands", tmp_path / "b" / "b.demands")
+    shutil.copy("tests/data/parsing/bad/bad_memo.demands", tmp_path / "b" / "b.0002.demands")
+    return tmp_path
+
+
+def test_discover(dataset_dir):
+    pairs = loader.discover(dataset_dir)
+
+    assert [(t.name, d.name) for t, d in pairs] == [
+        ("a.graph", "a.0000.demands"),
+        ("a.graph", "a.0001.demands"),
+        ("b.graph", "b.0000.demands"),
+        ("b.graph", "b.0001.demands"),
+        ("b.graph", "b.0002.demands"),
+        ("b.graph", "b.demands"),
+    ]
+
+
+def test_discover_dotted_names(tmp_path):
+    # Snapshots of `foo.bar` must not be paired with `foo`
+    for name in ["foo.graph", "foo.bar.graph", "foo.0000.demands", "foo.bar.0000.demands"]:
+        (tmp_path / name).touch()
+
+    assert [(t.name, d.name) for t, d in loader.discover(tmp_path)] == [
+        ("foo.bar.graph", "foo.bar.0000.demands"),
+        ("foo.graph", "foo.0000.demands"),
+    ]
+
+
+@pytest.mark.parametrize("max_workers, chunksize, max_in_flight", [(1, 1, None), (2, 1, 1), (2, 2, None)])
+def test_load(dataset_dir, max_workers, chunksize, max_in_flight):
+    results = list(loader.load(dataset_dir, max_workers=max_workers, chunksize=chunksize, max_in_flight=max_in_flight))
+    assert len(results) == 6
+
+    expected = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+    by_name = {r.demands_file.name: r for r in results}
+    for name in ["a.0000.demands", "a.0001.demands", "b.0000.demands", "b.0001.demands"]:
+        assert by_name[name].ok
+        assert by_name[name].instance == expected
+
+    validation_result = by_name["b.demands"]
+    assert isinstance(validation_result.error, errors.ValidationError)
+    assert validation_result.error.demands_path == validation_result.demands_file
+
+    parse_result = by_name["b.0002.demands"]
+    assert isinstance(parse_result.error, errors.ParseError)
+    assert parse_result.error.line_num == 2
+    assert "expected demands memo line" in str(parse_result.error)
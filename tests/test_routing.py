@@ -0,0 +1,221 @@
+import subprocess
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import generator, routing, topology
+from repetita_parser.instance import Instance
+
+
+def _diamond() -> topology.Topology:
+    # Two equal-cost paths 0 -> 1 -> 3 and 0 -> 2 -> 3, plus a parallel edge 1 -> 3
+    nodes = [topology.Node(str(i), 0.0, 0.0) for i in range(4)]
+    edges = [
+        topology.Edge("e0", 0, 1, 1.0, 10.0, 1.0),
+        topology.Edge("e1", 0, 2, 1.0, 10.0, 1.0),
+        topology.Edge("e2", 1, 3, 1.0, 10.0, 1.0),
+        topology.Edge("e3", 2, 3, 1.0, 10.0, 1.0),
+        topology.Edge("e4", 1, 3, 1.0, 10.0, 1.0),
+        topology.Edge("e5", 0, 3, 3.0, 10.0, 1.0),
+    ]
+    return topology.Topology(nodes, edges, "diamond")
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_distances(use_scipy):
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+    cols = topo.edge_columns
+    sp = routing.compute_shortest_paths(topo.num_nodes, cols.src, cols.dest, cols.weight, use_scipy=use_scipy)
+
+    g = topo.as_nx_graph()
+    for *_, data in g.edges(data=True):
+        data["weight"] = data["obj"].weight
+    expected = dict(nx.all_pairs_dijkstra_path_length(g))
+    for u in range(topo.num_nodes):
+        for v in range(topo.num_nodes):
+            assert sp.distances[u, v] == expected[u].get(v, np.inf)
+
+    # Splits towards any destination sum up to one at every other node
+    for t in range(topo.num_nodes):
+        per_node = np.bincount(cols.src, weights=sp.splits[:, t], minlength=topo.num_nodes)
+        assert np.allclose(np.delete(per_node, t), 1.0)
+        assert per_node[t] == 0.0
+
+
+def test_ecmp():
+    sp = _diamond().shortest_paths()
+
+    assert sp.distances[0, 3] == 2.0
+    assert sp.next_hops(0, 3).tolist() == [0, 1]
+    assert sp.next_hops(1, 3).tolist() == [2, 4]
+    assert sp.splits[:, 3].tolist() == [0.5, 0.5, 0.5, 1.0, 0.5, 0.0]
+    assert not sp.on_path[:, 0].any()
+
+
+def test_cache():
+    topo = _diamond()
+
+    assert topo.shortest_paths() is topo.shortest_paths()
+
+    weights = np.array([1.0, 2.0, 1.0, 1.0, 1.0, 3.0])
+    sp = topo.shortest_paths(weights)
+    assert sp is topo.shortest_paths(weights.copy())
+    assert sp.next_hops(0, 3).tolist() == [0]
+
+    # The cache is cleared when edges change
+    topo.edges = topo.edges[:4]
+    assert topo.shortest_paths().on_path.shape == (4, 4)
+
+
+def test_invalid_weights():
+    topo = _diamond()
+
+    with pytest.raises(ValueError, match="edge weights must be non-negative"):
+        topo.shortest_paths(np.array([1.0, -1.0, 1.0, 1.0, 1.0, 1.0]))
+    with pytest.raises(ValueError, match="expected one weight per edge"):
+        topo.shortest_paths(np.ones(2))
+
+
+def test_no_scipy(monkeypatch):
+    monkeypatch.setattr(routing, "_has_scipy", False)
+
+    topo = _diamond()
+    assert topo.shortest_paths().distances[0, 3] == 2.0
+    cols = topo.edge_columns
+    with pytest.raises(ImportError, match="SciPy is required"):
+        routing.compute_shortest_paths(topo.num_nodes, cols.src, cols.dest, cols.weight, use_scipy=True)
+
+
+def test_lazy_scipy():
+    # Importing the package must not import SciPy
+    code = "import sys, repetita_parser.instance; assert 'scipy' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+def test_route():
+    topo = _diamond()
+    tm = np.zeros((4, 4))
+    tm[0, 3] = 8.0
+    tm[2, 3] = 1.0
+    tm[3, 3] = 5.0
+
+    loads = routing.route(topo.shortest_paths(), tm)
+    assert loads.tolist() == [4.0, 4.0, 2.0, 5.0, 2.0, 0.0]
+
+
+def test_evaluate():
+    i = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+    result = routing.evaluate(i)
+
+    # Reference: walk every demand along its ECMP shortest paths
+    sp = i.topology.shortest_paths()
+    expected = np.zeros(i.topology.num_edges)
+    for s in range(i.topology.num_nodes):
+        for t in range(i.topology.num_nodes):
+            at_node = {s: i.traffic_matrix[s, t]} if s != t else {}
+            for u in np.argsort(-sp.distances[:, t]):
+                volume = at_node.pop(int(u), 0.0)
+                for e in sp.next_hops(int(u), t):
+                    expected[e] += volume * sp.splits[e, t]
+                    v = int(sp.edge_dest[e])
+                    at_node[v] = at_node.get(v, 0.0) + volume * sp.splits[e, t]
+
+    assert np.allclose(result.loads, expected)
+    assert np.allclose(result.utilization, expected / i.topology.edge_columns.bandwidth)
+    assert result.max_utilization == result.utilization.max()
+
+    sparse = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH, sparse_tm=True)
+    assert np.allclose(routing.evaluate(sparse).loads, result.loads)
+
+
+def test_routing_matrix(tmp_path):
+    i = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+    sp = i.topology.shortest_paths()
+    rm = routing.routing_matrix(sp)
+
+    assert rm.shape == (110, 900)
+    assert np.allclose(rm @ i.traffic_matrix.ravel(), routing.route(sp, i.traffic_matrix))
+
+    tms = np.stack([i.traffic_matrix, 2 * i.traffic_matrix, np.zeros((30, 30))])
+    loads = routing.route_batch(rm, tms)
+    assert loads.shape == (3, 110)
+    for tm, expected in zip(tms, loads):
+        assert np.allclose(routing.route(sp, tm), expected)
+
+    routing.save_routing_matrix(tmp_path / "rm.npz", rm)
+    assert (routing.load_routing_matrix(tmp_path / "rm.npz") != rm).nnz == 0
+
+
+def test_routing_matrix_blocks(monkeypatch):
+    # Destinations traced in several blocks yield the same matrix
+    topo = generator.generate_topology(40, model="geometric", seed=3)
+    sp = topo.shortest_paths()
+    rm = routing.routing_matrix(sp)
+    monkeypatch.setattr(routing, "_MAX_BLOCK_PAIRS", 100)
+    assert abs(routing.routing_matrix(sp) - rm).max() < 1e-12
+
+    tm = np.random.default_rng(0).uniform(size=(40, 40))
+    assert np.allclose(rm @ tm.ravel(), routing.route(sp, tm))
+    # Each routed unit of traffic leaves its source exactly once
+    out_edges = rm[topo.edge_columns.src == 0, :40].sum(axis=0)
+    reachable = np.isfinite(sp.distances[0, :]) & (np.arange(40) != 0)
+    assert np.allclose(out_edges, reachable)
+
+
+def test_routing_matrix_no_scipy(monkeypatch):
+    monkeypatch.setattr(routing, "_has_scipy", False)
+
+    with pytest.raises(ImportError, match="SciPy is required to work with routing matrices"):
+        routing.routing_matrix(_diamond().shortest_paths())
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_routing_state(use_scipy):
+    i = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+    cols = i.topology.edge_columns
+    state = routing.RoutingState(i.topology, i.traffic_matrix, use_scipy=use_scipy)
+    initial_loads = state.loads.copy()
+
+    rng = np.random.default_rng(0)
+    weights = cols.weight.copy()
+    for _ in range(20):
+        edge = int(rng.integers(i.topology.num_edges))
+        weights[edge] = float(rng.integers(1, 5))
+        state.set_weight(edge, weights[edge])
+
+        expected = routing.compute_shortest_paths(i.topology.num_nodes, cols.src, cols.dest, weights)
+        assert np.array_equal(state.distances, expected.distances)
+        assert np.array_equal(state.on_path, expected.on_path)
+        assert np.allclose(state.loads, routing.route(expected, i.traffic_matrix))
+
+    assert state.num_changes == 20
+    for _ in range(20):
+        state.undo()
+    assert np.array_equal(state.weights, cols.weight)
+    assert np.array_equal(state.loads, initial_loads)
+
+    with pytest.raises(IndexError, match="no weight change to undo"):
+        state.undo()
+
+
+def test_routing_state_affected():
+    topo = _diamond()
+    tm = np.zeros((4, 4))
+    tm[0, 3] = 8.0
+    state = routing.RoutingState(topo, tm)
+
+    # Making edge 0 -> 3 lighter only affects destination 3, and only once it
+    # becomes part of a shortest path
+    assert state.set_weight(5, 2.5).tolist() == []
+    assert state.set_weight(5, 1.5).tolist() == [3]
+    assert state.link_loads().loads.tolist() == [0.0, 0.0, 0.0, 0.0, 0.0, 8.0]
+
+    state.commit()
+    assert state.num_changes == 0
+
+    # Edge 0 -> 2 is only on the shortest path towards node 2
+    assert state.set_weight(1, 5.0).tolist() == [2]
+    assert state.distances[0, 2] == 5.0
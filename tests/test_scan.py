@@ -0,0 +1,51 @@
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import demands, errors, topology
+from repetita_parser.scan import scan
+
+
+def test_scan_topology():
+    info = scan(TOPOLOGY_FILE_PATH)
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+
+    assert info.num_nodes == topo.num_nodes
+    assert info.num_edges == topo.num_edges
+    assert info.num_demands is None
+    assert info.file_size == TOPOLOGY_FILE_PATH.stat().st_size
+
+
+def test_scan_demands():
+    info = scan(DEMANDS_FILE_PATH)
+
+    assert info.num_demands == len(demands.parse(DEMANDS_FILE_PATH))
+    assert info.num_nodes is None
+    assert info.file_size == DEMANDS_FILE_PATH.stat().st_size
+
+
+def test_scan_comments(tmp_path):
+    topo_file = tmp_path / "comments.graph"
+    topo_file.write_text(
+        "# comment\nNODES 1\nlabel x y\n# EDGES 7\nn 0.0 0.0\n\nEDGES 0\nlabel src dest weight bw delay\n"
+    )
+
+    info = scan(topo_file)
+    assert (info.num_nodes, info.num_edges) == (1, 0)
+
+
+@pytest.mark.parametrize(
+    "text, match",
+    [
+        ("", "expected nodes or demands header line"),
+        ("EDGES 3\n", "expected nodes or demands header line"),
+        ("DEMANDS x\n", "expected nodes or demands header line"),
+        ("NODES 0\nlabel x y\n\n", "expected edges header line"),
+        ("NODES 0\nlabel x y\n\nEDGES 1 2\n", "expected edges header line"),
+    ],
+)
+def test_scan_errors(tmp_path, text, match):
+    bad_file = tmp_path / "bad"
+    bad_file.write_text(text)
+
+    with pytest.raises(errors.ParseError, match=match):
+        scan(bad_file)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import routing, topology
+from repetita_parser.instance import Instance
+from repetita_parser.segment_routing import SegmentRouting
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+
+def _unit_loads(sp, src, dest):
+    tm = np.zeros((sp.num_nodes, sp.num_nodes))
+    tm[src, dest] = 1.0
+    return routing.route(sp, tm)
+
+
+def test_two_segment_loads(instance):
+    sp = instance.topology.shortest_paths()
+    sr = SegmentRouting(sp)
+
+    for src, dest in [(0, 1), (3, 17), (29, 0)]:
+        assert np.allclose(sr.segment_loads(src, dest), _unit_loads(sp, src, dest))
+
+        loads = sr.two_segment_loads(src, dest)
+        assert loads.shape == (30, 110)
+        for mid in range(30):
+            expected = _unit_loads(sp, src, mid) + _unit_loads(sp, mid, dest)
+            assert np.allclose(loads[mid], expected)
+
+        # Midpoints at either end yield the plain shortest path
+        assert np.allclose(loads[src], sr.segment_loads(src, dest))
+        assert np.allclose(loads[dest], sr.segment_loads(src, dest))
+
+
+def test_score_midpoints(instance):
+    sp = instance.topology.shortest_paths()
+    sr = SegmentRouting(sp)
+    bandwidth = instance.topology.edge_columns.bandwidth
+    base_loads = routing.route(sp, instance.traffic_matrix)
+
+    scores = sr.score_midpoints(0, 1, 1000.0, base_loads, bandwidth)
+    for mid in [0, 5, 20]:
+        expected = (base_loads + 1000.0 * sr.two_segment_loads(0, 1)[mid]) / bandwidth
+        assert scores[mid] == pytest.approx(expected.max())
+
+
+def test_invalid_midpoints():
+    # Node 2 cannot be reached from node 0
+    nodes = [topology.Node(str(i), 0.0, 0.0) for i in range(3)]
+    edges = [topology.Edge("e0", 0, 1, 1.0, 10.0, 1.0), topology.Edge("e1", 1, 0, 1.0, 10.0, 1.0)]
+    sr = SegmentRouting(topology.Topology(nodes, edges, "topo").shortest_paths())
+
+    assert sr.valid_midpoints(0, 1).tolist() == [True, True, False]
+    assert sr.score_midpoints(0, 1, 5.0, np.zeros(2), np.full(2, 10.0)).tolist() == [0.5, 0.5, np.inf]
+
+
+def test_two_segment_loads_invalid_midpoint():
+    # Node 2 is reachable from node 0, but node 1 is not reachable from node 2
+    nodes = [topology.Node(str(i), 0.0, 0.0) for i in range(3)]
+    edges = [
+        topology.Edge("e0", 0, 1, 1.0, 10.0, 1.0),
+        topology.Edge("e1", 1, 0, 1.0, 10.0, 1.0),
+        topology.Edge("e2", 0, 2, 1.0, 10.0, 1.0),
+    ]
+    sr = SegmentRouting(topology.Topology(nodes, edges, "topo").shortest_paths())
+
+    assert sr.two_segment_loads(0, 1).tolist() == [[1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
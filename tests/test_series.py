@@ -0,0 +1,45 @@
+import shutil
+
+import numpy as np
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import errors
+from repetita_parser.instance import Instance
+from repetita_parser.series import InstanceSeries
+
+
+@pytest.fixture
+def series_dir(tmp_path):
+    shutil.copy(TOPOLOGY_FILE_PATH, tmp_path / "DeutscheTelekom.graph")
+    for snapshot in range(3):
+        shutil.copy(DEMANDS_FILE_PATH, tmp_path / f"DeutscheTelekom.{snapshot:04}.demands")
+    # Snapshot of a different topology whose name starts with the same prefix
+    shutil.copy(DEMANDS_FILE_PATH, tmp_path / "DeutscheTelekom.bar.0000.demands")
+    return tmp_path
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_series(series_dir, max_workers):
+    series = InstanceSeries.from_directory(series_dir, "DeutscheTelekom", max_workers=max_workers)
+    single = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+    assert len(series) == 3
+    assert series.traffic_tensor.shape == (3, 30, 30)
+    for snapshot, instance in enumerate(series):
+        assert instance.topology is series.topology
+        assert instance.demands == single.demands
+        assert np.array_equal(series.traffic_tensor[snapshot], single.traffic_matrix)
+
+
+def test_series_validation(series_dir):
+    bad = "tests/data/validation/bad/src_bad.demands"
+    with pytest.raises(errors.ValidationError, match="demand src_bad:"):
+        InstanceSeries(series_dir / "DeutscheTelekom.graph", [DEMANDS_FILE_PATH, bad], max_workers=1)
+
+    # Without validation, invalid demands surface when building the tensor
+    series = InstanceSeries(
+        series_dir / "DeutscheTelekom.graph", [DEMANDS_FILE_PATH, bad], max_workers=1, validate=False
+    )
+    with pytest.raises(IndexError, match="out of bounds"):
+        series.traffic_tensor  # noqa: B018
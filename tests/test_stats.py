@@ -0,0 +1,61 @@
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import demands, topology
+from repetita_parser.instance import Instance
+from repetita_parser.stats import ParseStats
+
+
+def test_instance_phases():
+    finished = []
+    stats = ParseStats(callback=finished.append)
+    instance = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH, stats=stats)
+    instance.traffic_matrix  # noqa: B018
+
+    names = [
+        "topology.nodes",
+        "topology.edges",
+        "demands.read",
+        "demands.convert",
+        "instance.validate",
+        "instance.traffic_matrix",
+    ]
+    assert [p.name for p in stats.phases] == names
+    assert finished == stats.phases
+    assert stats.total_seconds == pytest.approx(sum(p.seconds for p in stats.phases))
+
+    # 30 nodes plus header, memo and blank line; 110 edges plus header and memo
+    assert stats["topology.nodes"].lines == 33
+    assert stats["topology.edges"].lines == 112
+    assert stats["demands.convert"].lines == 872
+    assert stats["instance.validate"].lines == 870
+
+    file_size = TOPOLOGY_FILE_PATH.stat().st_size
+    assert stats["topology.nodes"].bytes_read + stats["topology.edges"].bytes_read == file_size
+    assert stats["demands.read"].bytes_read == DEMANDS_FILE_PATH.stat().st_size
+    assert all(p.peak_bytes is None for p in stats.phases)
+
+
+def test_comment_lines():
+    stats = ParseStats()
+    topology.parse(
+        b"# a\nNODES 1\nlabel x y\n# b\nn 0 0\n\n# c\n# d\nEDGES 0\nlabel src dest weight bw delay\n",
+        strict=False,
+        stats=stats,
+    )
+    demands.parse(b"# a\nDEMANDS 1\nlabel src dest bw\n# b\nd 0 1 1.0\n", strict=False, stats=stats)
+
+    assert stats["topology.nodes"].comment_lines == 2
+    assert stats["topology.edges"].comment_lines == 2
+    assert stats["demands.convert"].comment_lines == 2
+    assert stats["topology.nodes"].bytes_read == len(b"# a\nNODES 1\nlabel x y\n# b\nn 0 0\n\n")
+
+
+def test_trace_memory():
+    stats = ParseStats(trace_memory=True)
+    demands.parse(DEMANDS_FILE_PATH, stats=stats)
+
+    assert stats["demands.convert"].peak_bytes > 0
+
+    with pytest.raises(KeyError):
+        stats["topology.nodes"]
@@ -1,5 +1,8 @@
+import gzip
+import io
 from pathlib import Path
 
+import numpy as np
 import pytest
 from paths import EXPORT_TOPOLOGY_FILE_PATH, TOPOLOGY_FILE_PATH
 
@@ -45,6 +48,53 @@ def test_export():
     assert not (ground_truth_topo != import_topo)
 
 
+def test_export_formats(tmp_path):
+    parsed = topology.parse(TOPOLOGY_FILE_PATH)
+    nodes, edges = parsed.nodes, parsed.edges
+    expected = f"NODES {len(nodes)}\n" + topology.NODES_MEMO_LINE
+    expected += "".join(f"{n.label} {n.x} {n.y}\n" for n in nodes)
+    expected += f"\nEDGES {len(edges)}\n" + topology.EDGES_MEMO_LINE
+    expected += "".join(f"{e.label} {e.src} {e.dest} {e.weight} {e.bandwidth} {e.delay}\n" for e in edges)
+
+    # Column export, list export and binary targets write the same text
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+    text = io.StringIO()
+    topo.export(text)
+    assert topo._nodes is None
+    assert text.getvalue() == expected
+
+    binary = io.BytesIO()
+    topology.Topology(nodes, edges, TOPOLOGY_FILE_PATH).export(binary)
+    assert binary.getvalue() == expected.encode()
+
+    # Values of list-backed topologies are written as they are
+    from_ints = io.StringIO()
+    topology.Topology([topology.Node("n", 1, 2)], [topology.Edge("e", 0, 0, 1, 10, 2)], "topo").export(from_ints)
+    assert "\nn 1 2\n" in from_ints.getvalue()
+    assert from_ints.getvalue().endswith("\ne 0 0 1 10 2\n")
+
+    topo.export(tmp_path / "exported.graph.gz")
+    with gzip.open(tmp_path / "exported.graph.gz", "rt") as f:
+        assert f.read() == expected
+
+
+def test_parse_streams_and_buffers():
+    expected = topology.parse(TOPOLOGY_FILE_PATH)
+    data = TOPOLOGY_FILE_PATH.read_bytes()
+
+    binary = io.BytesIO(data)
+    for source in [data, bytearray(data), memoryview(data), binary, io.StringIO(data.decode())]:
+        assert topology.parse(source) == expected
+    assert not binary.closed
+
+    topo = topology.parse(data.replace(b"\n", b"\r\n"), source_name="upload")
+    assert topo == expected
+    assert topo.source_file == "upload"
+
+    with pytest.raises(errors.ParseError, match=r"^upload:1: expected nodes header line"):
+        topology.parse(b"EDGES 0\n", source_name="upload")
+
+
 bad_root = Path("tests/data/parsing/bad")
 
 
@@ -65,3 +115,64 @@ bad_root = Path("tests/data/parsing/bad")
 def test_parse_errors(topo_file, expectation):
     with expectation:
         topology.parse(topo_file)
+
+
+def test_columns():
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+
+    assert topo.num_nodes == len(topo.node_columns) == 30
+    assert topo.num_edges == len(topo.edge_columns) == 110
+    assert topo.edge_columns.src.dtype == np.int64
+    assert topo.edge_columns.weight.dtype == np.float64
+
+    # Lazily materialized views match the columns
+    assert topo.nodes[0] == topology.Node(topo.node_columns.label[0], topo.node_columns.x[0], topo.node_columns.y[0])
+    assert [e.src for e in topo.edges] == topo.edge_columns.src.tolist()
+    assert type(topo.edges[0].label) is str
+
+    # Round trip through the list representation
+    from_lists = topology.Topology(topo.nodes, topo.edges, TOPOLOGY_FILE_PATH)
+    assert from_lists.node_columns.label.tolist() == topo.node_columns.label.tolist()
+    assert from_lists == topo
+
+
+def test_lookup():
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+
+    for idx, node in enumerate(topo.nodes):
+        assert topo.node_index(node.label) == idx
+    with pytest.raises(KeyError):
+        topo.node_index("does_not_exist")
+
+    for src, dest in [(0, 7), (7, 0), (0, 1), (0, 0)]:
+        expected = [idx for idx, e in enumerate(topo.edges) if e.src == src and e.dest == dest]
+        assert topo.edge_indices(src, dest).tolist() == expected
+
+    # Lookup structures are rebuilt when the edges are replaced
+    topo.edges = [*topo.edges, topology.Edge("extra", 0, 7, 1.0, 1.0, 1.0)]
+    assert topo.edge_indices(0, 7).tolist() == [0, 110]
+
+
+def test_adjacency():
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+    adj = topo.adjacency
+    g = topo.as_nx_graph()
+
+    assert adj is topo.adjacency
+    assert adj.num_nodes == 30
+    assert adj.out_degree().tolist() == [g.out_degree(n) for n in range(30)]
+    assert adj.in_degree().tolist() == [g.in_degree(n) for n in range(30)]
+
+    for node in range(30):
+        assert sorted(adj.successors(node).tolist()) == sorted(dest for _, dest in g.out_edges(node))
+        assert sorted(adj.predecessors(node).tolist()) == sorted(src for src, _ in g.in_edges(node))
+        assert all(topo.edges[e].src == node for e in adj.edges_from(node))
+        assert all(topo.edges[e].dest == node for e in adj.edges_to(node))
+        assert [topo.edges[e].dest for e in adj.edges_from(node)] == adj.successors(node).tolist()
+
+
+def test_adjacency_invalid_edge():
+    topo = topology.Topology([topology.Node("a", 0.0, 0.0)], [topology.Edge("e", 0, 1, 1.0, 1.0, 1.0)], "topo")
+
+    with pytest.raises(ValueError, match="edge 0 references a node index"):
+        topo.adjacency  # noqa: B018
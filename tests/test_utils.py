@@ -0,0 +1,70 @@
+import gzip
+import lzma
+import shutil
+
+import pytest
+from paths import DEMANDS_FILE_PATH, TOPOLOGY_FILE_PATH
+
+from repetita_parser import demands, topology, utils
+from repetita_parser.instance import Instance
+from repetita_parser.scan import scan
+
+
+@pytest.fixture(scope="module")
+def compressed_files(tmp_path_factory):
+    """Gzip- and xz-compressed copies of the test instance, with and without suffix"""
+    root = tmp_path_factory.mktemp("compressed")
+    files = {}
+    for name, opener in [("gz", gzip.open), ("xz", lzma.open)]:
+        for kind, source in [("graph", TOPOLOGY_FILE_PATH), ("demands", DEMANDS_FILE_PATH)]:
+            with open(source, "rb") as src, opener(root / f"instance.{kind}.{name}", "wb") as dest:
+                shutil.copyfileobj(src, dest)
+            shutil.copy(root / f"instance.{kind}.{name}", root / f"{name}_instance.{kind}")
+            files[kind, name] = root / f"instance.{kind}.{name}"
+            files[kind, f"{name}_magic"] = root / f"{name}_instance.{kind}"
+    return files
+
+
+@pytest.mark.parametrize("compression", ["gz", "gz_magic", "xz", "xz_magic"])
+def test_parse_compressed(compressed_files, compression):
+    topo_file = compressed_files["graph", compression]
+    dems_file = compressed_files["demands", compression]
+    expected = Instance(TOPOLOGY_FILE_PATH, DEMANDS_FILE_PATH)
+
+    assert utils.detect_compression(dems_file) == ("gzip" if compression.startswith("gz") else "xz")
+    assert Instance(topo_file, dems_file) == expected
+    assert demands.parse(dems_file, max_workers=2) == expected.demands
+    assert list(demands.iter_parse(dems_file)) == expected.demands.list
+
+    info = scan(topo_file)
+    assert (info.num_nodes, info.num_edges) == (expected.topology.num_nodes, expected.topology.num_edges)
+    assert scan(dems_file).num_demands == len(expected.demands)
+
+
+def test_export_compressed(tmp_path):
+    topo = topology.parse(TOPOLOGY_FILE_PATH)
+    topo.export(tmp_path / "exported.graph.xz")
+
+    assert utils.detect_compression(tmp_path / "exported.graph.xz") == "xz"
+    assert topology.parse(tmp_path / "exported.graph.xz") == topo
+
+
+def test_zstd(tmp_path, monkeypatch):
+    dems = demands.parse(DEMANDS_FILE_PATH)
+
+    with monkeypatch.context() as m:
+        m.setattr(utils, "_has_zstandard", False)
+        with pytest.raises(ImportError):
+            dems.export(tmp_path / "exported.demands.zst")
+
+    pytest.importorskip("zstandard")
+    dems.export(tmp_path / "exported.demands.zst")
+    assert demands.parse(tmp_path / "exported.demands.zst") == dems
+
+
+def test_snapshot_files(tmp_path):
+    names = ["a[1].0000.demands", "a[1].0001.demands", "a[1].b.0000.demands", "a[1].demands", "a1.0000.demands"]
+    for name in names:
+        (tmp_path / name).touch()
+
+    assert [p.name for p in utils.snapshot_files(tmp_path, "a[1]")] == ["a[1].0000.demands", "a[1].0001.demands"]